@@ -8,8 +8,13 @@ QT gui.  This elementary demo is boilerplate copied from:
     https://www.pythonguis.com/tutorials/plotting-matplotlib/
 See that site for ideas for adding features. 
 
+Setting environment variable OWIXSEC_BACKEND=pg selects a pyqtgraph canvas,
+PgCanvas, in place of the matplotlib canvas for interactive redrawing. This 
+requires the optional pyqtgraph package.
+
 @author: bill
 '''
+import os
 import sys
 import matplotlib
 matplotlib.use('Qt5Agg')
@@ -19,24 +24,125 @@ from PyQt5 import QtCore, QtWidgets
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
+try:
+    import pyqtgraph as pg
+except ImportError:
+    pg = None
+
 
 class MplCanvas(FigureCanvasQTAgg):
+    """
+    A matplotlib canvas with a single set of axes, built once and redrawn.
+    
+    Notes
+    -----
+    o   The Figure and axes are created only in __init__. To redraw, call 
+        update_line() which replaces the data of one animated line, restores
+        the saved background bitmap, and blits only the axes area. The axes, 
+        ticks and labels are not recomputed.
+    o   The background is saved on every full draw (draw_event), e.g. after a
+        resize or after update_line(..., rescale=True).
+    """
 
     def __init__(self, parent=None, width=5, height=4, dpi=100):
         fig = Figure(figsize=(width, height), dpi=dpi)
         self.axes = fig.add_subplot(111)
         super(MplCanvas, self).__init__(fig)
+        self.setParent(parent)
+        self._line, = self.axes.plot([], [], animated=True)
+        self._bg = None
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """ Save the background after a full draw, and draw the line on it """
+        self._bg = self.copy_from_bbox(self.axes.bbox)
+        self.axes.draw_artist(self._line)
+
+    def update_line(self, x, y, rescale=False):
+        """
+        Replace the line data and redraw it by blitting.
+        
+        Arguments
+        ---------
+        x, y : sequences of float
+            New line coordinates.
+        rescale : bool
+            If True, or if there is no saved background yet, the axes limits
+            are fit to the new data and the whole canvas is redrawn.
+        """
+        self._line.set_data(x, y)
+        if rescale or self._bg is None:
+            self.axes.relim()
+            self.axes.autoscale_view()
+            self.draw()
+            return
+        self.restore_region(self._bg)
+        self.axes.draw_artist(self._line)
+        self.blit(self.axes.bbox)
+
+if pg is not None:
+    class PgCanvas(pg.PlotWidget):
+        """
+        A pyqtgraph alternative to MplCanvas for fast interactive updates.
+        
+        Notes
+        -----
+        o   self.axes is the PlotItem, so self.axes.plot(x, y) works as it 
+            does on MplCanvas.
+        o   update_line() replaces the data of one PlotDataItem with setData,
+            which pyqtgraph redraws without rebuilding the plot.
+        o   The size arguments match MplCanvas; width and height are in inches
+            at dpi dots per inch.
+        """
+    
+        def __init__(self, parent=None, width=5, height=4, dpi=100):
+            super(PgCanvas, self).__init__(parent)
+            self.resize(int(width * dpi), int(height * dpi))
+            self.axes = self.plotItem
+            self._line = self.axes.plot([], [], pen='b', symbol='o')
+    
+        def update_line(self, x, y, rescale=False):
+            """
+            Replace the line data.  If rescale, fit the view to the new data.
+            """
+            self._line.setData(x, y)
+            if rescale:
+                self.axes.autoRange()
+
+_canvas = None
+
+def get_canvas(parent=None, width=6, height=6, dpi=300):
+    """
+    Return the module level canvas, creating it on the first call.
+    
+    The canvas is a PgCanvas if environment variable OWIXSEC_BACKEND is 'pg'
+    and pyqtgraph is installed, and is a MplCanvas otherwise. The size 
+    arguments are used only when the canvas is created.
+    """
+    global _canvas
+    if _canvas is None:
+        if os.environ.get('OWIXSEC_BACKEND') == 'pg' and pg is not None:
+            _canvas = PgCanvas(parent, width=width, height=height, dpi=dpi)
+        else:
+            _canvas = MplCanvas(parent, width=width, height=height, dpi=dpi)
+    return _canvas
 
 class XsecWindow(QtWidgets.QMainWindow):
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-        # Create the maptlotlib FigureCanvas object,
-        # which defines a single set of axes as self.axes.
-        # sc = MplCanvas(self, width=6, height=6, dpi=300)
-        # sc.axes.plot([0,1,2,3,4], [10,1,20,3,40])
-        self.setCentralWidget(kwargs['plt'])
+    """
+    A window showing a canvas supplied by the caller.
+    
+    Arguments
+    ---------
+    plt : MplCanvas, PgCanvas, or None
+        The canvas to show. If None, the module level canvas from get_canvas()
+        is used.
+    """
+
+    def __init__(self, *args, plt=None, **kwargs):
+        super(XsecWindow, self).__init__(*args, **kwargs)
+        if plt is None:
+            plt = get_canvas(self, width=6, height=6, dpi=300)
+        self.setCentralWidget(plt)
 
         self.show()
 
@@ -45,17 +151,24 @@ class MainWindow(QtWidgets.QMainWindow):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Create the maptlotlib FigureCanvas object,
-        # which defines a single set of axes as self.axes.
-        sc = MplCanvas(self, width=6, height=6, dpi=300)
-        sc.axes.plot([0,1,2,3,4], [10,1,20,3,40])
+        # Get the maptlotlib FigureCanvas object, which defines a single set 
+        # of axes as self.axes.  It is created once, and later calls to 
+        # update_line() redraw only the line.
+        sc = get_canvas(self, width=6, height=6, dpi=300)
+        sc.update_line([0,1,2,3,4], [10,1,20,3,40], rescale=True)
         self.setCentralWidget(sc)
 
         self.show()
 
 
-app = QtWidgets.QApplication(sys.argv)
-w = MainWindow()
-app.exec_()
+def get_app():
+    """ Return the running QApplication, creating it only if there is none """
+    return (QtWidgets.QApplication.instance() 
+            or QtWidgets.QApplication(sys.argv))
+
+if __name__ == '__main__':
+    app = get_app()
+    w = MainWindow()
+    app.exec_()
 
 
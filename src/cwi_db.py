@@ -10,12 +10,15 @@ Created on May 24, 2021
 
 A simple interface to a cwi clone database in sqlite. 
 
-Provides a context manager that handles open and close, and a qmarks() method.
+Provides a context manager that handles open and close, a qmarks() method,
+and a bulk_insert() method for loading tables.
 User should use standard pyodbc calls to execute queries. 
 
 @author: Bill Olsen
 '''
 import os
+import pathlib
+from itertools import islice
 import sqlite3 as sqlite
 import logging
 logger = logging.getLogger('cwi_db')
@@ -24,6 +27,9 @@ if __name__ == '__main__':
     format = '%(asctime)s - %(name)s:%(funcName)s:%(lineno)d - %(levelname)s -- %(message)s')
 logger.setLevel(logging.WARNING)
 
+# Precomputed qmarks strings for the common small parameter counts.
+_QMARKS = tuple(','.join(n * ['?']) for n in range(64))
+
 def read_sql_file(sql_file): 
     """
     Read sql statments from an sql file.
@@ -71,25 +77,43 @@ class DB_context_manager():
     The db should support methods:
         open_db()
         commit_db()
+        close_db()
     The db should instantiate boolean variables:
-        context_connected : True when a connection and cursor exist
+        connection_open : True when a connection and cursor exist
+        context_connected : True if the connection was already open when the
+                            outermost context was entered.
         context_autocommit : True if db should be committed prior to closing 
                              the connection.
+    
+    Notes
+    -----
+    o   The connection is kept on the instance and reused.  Entering a context
+        opens it only if it is not already open, and nested contexts are 
+        counted, so only the exit from the outermost context closes it.  
+    o   A connection that was opened before the outermost context was entered
+        is left open on exit.  Close it explicitly with close_db().
     """
     
     def __init__(self, commit=False):    
         self.context_connected = False
         self.context_autocommit = commit
+        self._refcount = 0
     
     def __enter__(self):
-        self.context_connected = self.connection_open==True
-        self.open_db()
+        if self._refcount == 0:
+            self.context_connected = self.connection_open==True
+            if not self.connection_open:
+                self.open_db()
+        self._refcount += 1
         return self
          
         
     def __exit__(self, exc_type, exc_value, exc_traceback): 
         if self.context_autocommit==True:
             self.commit_db()
+        self._refcount -= 1
+        if self._refcount > 0:
+            return
         if self.context_connected == False:
             self.close_db()
         self.context_connected = False
@@ -97,9 +121,39 @@ class DB_context_manager():
 
     
 class DB_SQLite(DB_context_manager):
+    """
+    Connection to an SQLite database.
+    
+    Arguments
+    ---------
+    db_name : str
+        Database file name, or ':memory:'
+    open_db : bool
+        Open the connection on construction.
+    commit : bool
+        Commit on exit from a context.
+    read_only : bool
+        Open the database in read only mode. Use this for the cross section
+        queries, which only read.
+    fast_io : bool
+        Switch the database to WAL journal mode and use memory mapped reads.
+        Default is False.  WAL mode is stored in the database file, it adds 
+        -wal and -shm files beside it, and it does not work on network 
+        shares, so use it only for local databases that you own.
+    
+    Notes
+    -----
+    o   cached_statements is the size of the connection's prepared statement 
+        cache.  Statements whose sql text is repeated on a connection are 
+        parsed only once.
+    """
+    cached_statements = 256
         
-    def __init__(self, db_name=None, open_db=False, commit=False):
+    def __init__(self, db_name=None, open_db=False, commit=False, 
+                 read_only=False, fast_io=False):
         self.db_name = db_name
+        self.read_only = read_only
+        self.fast_io = fast_io
         if open_db: 
             self.connection_open = self.open_db()
         else: 
@@ -116,14 +170,94 @@ class DB_SQLite(DB_context_manager):
 
     def open_db(self):
         try:
-            self.con = sqlite.connect(self.db_name)
+            if self.read_only and self.db_name != ':memory:':
+                uri = pathlib.Path(self.db_name).resolve().as_uri() + '?mode=ro'
+                self.con = sqlite.connect(uri, uri=True, 
+                                    cached_statements=self.cached_statements)
+            else:
+                self.con = sqlite.connect(self.db_name,
+                                    cached_statements=self.cached_statements)
             self.cur = self.con.cursor()
+            self.set_pragmas()
             self.connection_open = True
         except:
             logger.error (f"Could not open database: {self.db_name}")
             self.connection_open = False
         return self.connection_open
         
+    def set_pragmas(self):
+        """
+        Tune the connection for speed.
+        
+        -   A 64MB page cache and temp tables in memory.
+        -   With fast_io: memory mapped reads, and WAL journal mode with 
+            synchronous=NORMAL.  WAL is not set for read only or in-memory 
+            databases, where it is not permitted.
+        
+        A pragma that fails is logged and skipped, and the connection stays 
+        open.
+        """
+        pragmas = ["PRAGMA temp_store=MEMORY;",
+                   "PRAGMA cache_size=-65536;"]
+        if self.fast_io:
+            pragmas.append("PRAGMA mmap_size=268435456;")
+            if not self.read_only and self.db_name != ':memory:':
+                pragmas += ["PRAGMA journal_mode=WAL;",
+                            "PRAGMA synchronous=NORMAL;"]
+        for pragma in pragmas:
+            try:
+                self.cur.execute(pragma)
+            except sqlite.Error as e:
+                logger.warning(f"{pragma} failed on {self.db_name}: {e}")
+
+    def commit_db(self):
+        self.con.commit()
+
+    def bulk_insert(self, table, cols, rows, chunk=1000):
+        """
+        Insert rows into a table with executemany, one transaction per chunk.
+        
+        Arguments
+        ---------
+        table : str
+            Table name.  Identifiers cannot be parameters, so do not pass 
+            untrusted names.
+        cols : list of str
+            Column names, in the order of the values in each row.
+        rows : iterable of sequences
+            The row values.  May be a generator; it is read a chunk at a time.
+        chunk : int
+            Number of rows per executemany call and per commit.
+        
+        Returns
+        -------
+        n : int
+            Number of rows inserted.
+        
+        Notes
+        -----
+        o   synchronous=OFF is set for the load, so an OS crash or power loss
+            during the load may corrupt the database file.  The synchronous
+            setting in effect before the load is restored after.
+        """
+        collist = ','.join(f'[{c}]' for c in cols)
+        sql = f"INSERT INTO [{table}] ({collist}) VALUES ({self.qmarks(cols)})"
+        rows = iter(rows)
+        n = 0
+        synchronous = self.cur.execute("PRAGMA synchronous;").fetchone()[0]
+        self.cur.execute("PRAGMA synchronous=OFF;")
+        try:
+            while True:
+                batch = list(islice(rows, chunk))
+                if not batch:
+                    break
+                with self.con:
+                    self.cur.executemany(sql, batch)
+                n += len(batch)
+        finally:
+            self.cur.execute(f"PRAGMA synchronous={int(synchronous)};")
+        return n
+
     def close_db(self, commit=False):    
         if commit==True:
             if self.db_name == ':memory:':
@@ -149,20 +283,23 @@ class DB_SQLite(DB_context_manager):
         qmarks( 4 )             return '?,?,?,?'
         qmarks( [4] )           return '?'
         qmarks( (1,2,'Bozo') )  return '?,?,?'
+        
+        Strings for fewer than 64 variables are looked up in _QMARKS.
         '''
         if isinstance(vals, str):
             return '?'
-        elif isinstance(vals, int):
-            return ','.join(vals * ['?'])
-        else:
-            return ','.join(len(vals) * ['?'])
+        n = vals if isinstance(vals, int) else len(vals)
+        if 0 <= n < len(_QMARKS):
+            return _QMARKS[n]
+        return ','.join(n * ['?'])
 
 
 class c4db(DB_SQLite): 
     def __init__(self, 
                  db_name='.../OWI/db/cwi30.sqlite',
-                 open_db=False, commit=False):
-        DB_SQLite.__init__(self, db_name, open_db=open_db, commit=commit)
+                 open_db=False, commit=False, read_only=False, fast_io=False):
+        DB_SQLite.__init__(self, db_name, open_db=open_db, commit=commit,
+                           read_only=read_only, fast_io=fast_io)
         self.c4tables = 'c4ix c4ad c4c1 c4c2 c4id c4pl c4rm c4st c4wl c4locs'.split()
 
     def __str__(self):
@@ -182,11 +319,15 @@ if __name__ == '__main__':
     print (os.path.abspath('../demo_data/OWIxsec_demo.sqlite'))
     db = c4db(db_name = '../demo_data/OWIxsec_demo.sqlite', open_db=True)  
     s = "select tbl_name from sqlite_master where type='table';"
-    data = db.cur.execute(s).fetchall()
-    for row in data:
-        s = f"select count(*) from {row[0]};"
-        n = db.cur.execute(s).fetchall()
-        print (f"  {row[0]} :{n[0][0]:4} records")
+    tables = [row[0] for row in db.cur.execute(s).fetchall()]
+    if not tables:
+        print (f"  No tables found in {db.db_name}")
+    else:
+        # Count the records in all tables with a single statement.
+        s = ' union all '.join((f"select '{t}', count(*) from [{t}]" 
+                                for t in tables)) + ';'
+        for tbl, n in db.cur.execute(s).fetchall():
+            print (f"  {tbl} :{n:4} records")
     print ('/////////// DONE ////////////')
     
     
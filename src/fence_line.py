@@ -5,9 +5,12 @@ Created on Apr 27, 2021
 '''
 import numpy as np
 import unittest
-from functools import lru_cache
+import heapq
+from math import dist
 
-from geometry_base import Point, Line, Plyline, Rectangle
+from geometry_base import Point, Line, Plyline, Rectangle, njit, prange, \
+                          HAVE_NUMBA, wellset_from_dict
+from xsec_data_abc import Coord
 
 import logging
 logger = logging.getLogger('fence_line')
@@ -16,102 +19,111 @@ if __name__ == '__main__':
     format = '%(asctime)s - %(name)s:%(funcName)s:%(lineno)d - %(levelname)s -- %(message)s')
 logger.setLevel(logging.WARNING)
 
-@lru_cache(256)
 def hypot_p(a,b):
     """ Return hypotenuse between a=(x,y) and b=(x,y) """
-    return np.sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2)
+    return dist(a, b)
 
-@lru_cache(256)
-def score_swapM(a,b,c,d, d_xy):
-    """ 
-    Return the reduction in summed lengths due to swapping b and c
-    
-    Arguments
-    ---------
-    a,b,c,d: dictionary keys
-        Identifiers of points in dictionary d_xy.    
-        
-    d_xy : dictionary of points on the line
-        values are 2-tuples of (x,y) coordinates
-    
-    Returns
-    -------
-    Change_in_length : float
-        The change is the new total length minus the original total length. 
-        
-    target_indices : tuple of dictionary keys (b, c).
+@njit(cache=True)
+def _swap_scores(P, seg):
+    """
+    Return array dL, the change in length for each swap of adjacent points.
     
-    Notes
-    -----
-    -   Compares path length a-b-c-d to path length a-c-b-d.
-    -   Note that lengths b-c and c-b are the same, so the change in total path
-        length is equal to (ac + bd) - (ab + cd) 
-    -   A negative result means that swapping b and c reduces the total length
+    P is an (N,2) array of points, N>=3, and seg holds the N-1 segment lengths
+    of the polyline through P. dL[i] is the change in total length due to 
+    swapping points i and i+1; a negative dL shortens the line.  
+    See fenceline_smooth.
     """
-    ab = hypot_p(d_xy[a], d_xy[b])
-    cd = hypot_p(d_xy[c], d_xy[d])
-    ac = hypot_p(d_xy[a], d_xy[c])
-    bd = hypot_p(d_xy[b], d_xy[d])
-    return (ab + cd) - (ac + bd), (b,c)
+    skip = np.hypot(P[2:,0] - P[:-2,0], P[2:,1] - P[:-2,1])
+    dL = np.zeros(P.shape[0]-1)
+    dL[1:]  += skip - seg[:-1]
+    dL[:-1] += skip - seg[1:]
+    return dL
 
-@lru_cache(256)
-def score_swapE(b,c,d, d_xy):
-    """ 
-    Return the reduction in summed lengths due to swapping a and b
-    
-    Arguments
-    ---------
-    a,c,d: dictionary keys
-        Identifiers of points in dictionary d_xy. a should be an end-point 
-        
-    d_xy : dictionary of points on the line
-        values are 2-tuples of (x,y) coordinates
-    
-    Returns
-    -------
-    Change_in_length : float
-        The change is the new total length minus the original total length. 
-        
-    swapped_indices : tuple of 2 integers.
+def _swap_score(P, seg, i):
+    """ Return dL[i] of _swap_scores(P, seg), for the single swap i, i+1 """
+    dL = 0.
+    if i > 0:
+        dL += hypot_p(P[i-1], P[i+1]) - seg[i-1]
+    if i+2 < len(P):
+        dL += hypot_p(P[i], P[i+2]) - seg[i+1]
+    return dL
 
-    Notes
-    -----
+@njit(parallel=True, cache=True)
+def _fence_positions(A, U, V, seglen, s0, s1):
+    """
+    Return the position of each point in A along the userline with nodes U.
     
-    -   Index a should be an end point. The swap tried is between b and c. Point
-        d does not move.
-    -   The original total length is  bc + cd
-    -   The new total length is cb + bd 
-    -   But bc=cb, so the change is bd - cd 
-    -   A positive number means that swapping b and c results in a greater
-        total length
+    Compiled version of the nearest node search and projection in 
+    find_fenceline_with_userline, used if numba is installed.  The points are
+    processed in parallel.  For each point the nodes are compared by squared
+    distance, then the point is projected onto the 1 or 2 segments through 
+    its nearest node, so no (N,M) arrays are made.
     """
-    cd = hypot_p(d_xy[c], d_xy[d])
-    bd = hypot_p(d_xy[b], d_xy[d])
-    return bd - cd, (b,c)
+    n = V.shape[0]
+    pos = np.empty(A.shape[0])
+    for i in prange(A.shape[0]):
+        best = np.inf
+        k = 0
+        for j in range(U.shape[0]):
+            dx = A[i,0] - U[j,0]
+            dy = A[i,1] - U[j,1]
+            d = dx*dx + dy*dy
+            if d < best:
+                best = d
+                k = j
+        hasl = k > 0
+        hasr = k < n
+        xl = 0.0
+        xr = 0.0
+        rl = False
+        rr = False
+        if hasl:
+            j = k - 1
+            xl = ((A[i,0] - U[j,0])*V[j,0] + (A[i,1] - U[j,1])*V[j,1]) \
+                 / seglen[j] + s0[j]
+            rl = (s0[j] <= xl and xl <= s1[j]) or (j == n-1 and xl > s0[j])
+        if hasr:
+            j = k
+            xr = ((A[i,0] - U[j,0])*V[j,0] + (A[i,1] - U[j,1])*V[j,1]) \
+                 / seglen[j] + s0[j]
+            rr = (s0[j] <= xr and xr <= s1[j]) or (j == n-1 and xr > s0[j])
+        if rl and not rr:
+            pos[i] = xl
+        elif rr and not rl:
+            pos[i] = xr
+        elif hasl and hasr:
+            pos[i] = (xl + xr) / 2
+        elif hasl:
+            pos[i] = xl
+        else:
+            pos[i] = xr
+    return pos
 
-def fenceline_smooth(d_xy, ordered_wids):
+def fenceline_smooth(ws, order):
     """
     Alter the ordering of points along a fenceline to minimize total length.
     
     Arguments
     ---------
-    d_xy : dictionary of points on the line
+    ws : WellSet of points on the line
 
-    ordered_wids : ordered list of dictionary keys
+    order : array of int
+        Ordering of the points, as indices into ws.
     
     Returns
     -------
-    ordered_wids : ordered list of dictionary keys
+    order : array of int
+        Improved ordering of the points, as indices into ws.
     
     Notes
     -----
     o   Assumes that the ordered list provided is an optimal ordering on a 
         projected section-line, or is an approximate ordering along a user 
         supplied line.
-    o   The algorithm simply sweeps across the ordered list trying to see if
-        swapping an adjacent pair will shorten the overall length.  After each 
-        sweep of the entire list only one swap is acted on.  Sweeps continue
-        until no length reduction is seen.
+    o   The algorithm scores every swap of an adjacent pair by how much it
+        would shorten the overall length.  Only the best swap is acted on, 
+        and then the scores are updated.  Swapping continues until no length 
+        reduction is seen.
     o   Only adjacent pairs are swapped in any single trial.  But points can
         migrate after many swaps.
     o   Possible end-point swaps: 
@@ -119,72 +131,68 @@ def fenceline_smooth(d_xy, ordered_wids):
         -  The distance [ab] is unchanged. Swap if [ac] < [bc]
     o   Possible middle-point swaps:
         -  From [...a b c d...] to [...a c b d...]
-        -  The distance bc] is unchanged. Swap if [ac]+[bd] < [ab]+[cd]
-    o   The dictionary d_xy is unpacked to related lists K and P, because
-        calls to score_swap require hashable arguments, and dictionaries are not
-        hashable.  At the beginning, K is equal to the provided ordered_wids, 
-        and P is a list of point tuples (x,y) in order matching to K. K and P
+        -  The distance [bc] is unchanged. Swap if [ac]+[bd] < [ab]+[cd]
+    o   The ordering is copied to an index array K, and the points of ws to an 
+        (N,2) array P. At the beginning, K is equal to the provided order, and 
+        P holds the point coordinates (x,y) in order matching to K. K and P 
         are kept in matching order throughout.  Only K is returned however.
+    o   The segment lengths seg[i] = [P[i] P[i+1]] are computed once. Swapping
+        points i and i+1 changes only seg[i-1] and seg[i+1], so only those are
+        recomputed after a swap. 
+    o   The scores are held in a min-heap of (dL, i, gen) entries, so the best
+        swap is found without a sweep of the entire list.  A swap at i moves
+        points i and i+1, which changes the scores of swaps i-2 through i+2
+        only.  Those are rescored and pushed again, and their version counter
+        gen[j] is incremented, so that the outdated entries left in the heap
+        are recognized and discarded when they are popped.
+    o   The initial scores are a few array operations, done in _swap_scores().
+        That is compiled with numba if it is installed.
     o   If the algorithm produces an undesirable result, the user should provide
         either an angle hint or a user line hint.
     """
-    N = len(d_xy)
+    N = len(order)
     
     if N < 3: 
         # There is nothing to do
-        return ordered_wids
-#     l_key = list(d_xy.keys())
-#     l_xy = [d_xy[k] for k in l_key]
-    K = list(ordered_wids)
-    P = [d_xy[k] for k in K]
-    Q = tuple(P)
-    if N == 3:
-        # This case does not work in the general algorithm, and needs only 2 trys
-        dL1,  = score_swapE(0,1,2, Q)
-        dL2,swap_pair2 = score_swapE(2,1,0, Q)
-        if dL1 < 0 and dL1 < dL2:
-            K[0],K[1] = K[1],K[0]
-        elif dL2 < 0:
-            K[1],K[2] = K[2],K[1]
-        return K
+        return order
+
+    K = np.array(order, dtype=np.intp)
+    P = ws.xy[K]
+    seg = np.hypot(*(P[1:] - P[:-1]).T)
+    
+    gen = [0] * (N-1)
+    heap = [(dL, i, 0) for i, dL in enumerate(_swap_scores(P, seg).tolist())]
+    heapq.heapify(heap)
     
-    bestdL = -1
     icount = 0
-    while bestdL < 0:
-        best_dL = 1
-        best_swap = None
-        for i in range (0,N-3):
-            if i == 0:
-                dL, swap_pair = score_swapE(0,1,2, Q)
-            elif i == N-4:
-                dL, swap_pair = score_swapE(-1,-2,-3, Q)
-            else:
-                dL, swap_pair = score_swapE(i, i+1, i+2, Q)
-            if dL < bestdL:
-                bestdL, best_swap = dL, swap_pair
+    while icount <= 100:
+        dL, i, g = heapq.heappop(heap)
+        if g != gen[i]:
+            # outdated entry
+            continue
         icount += 1
-        logger.debug (f"swapping? {icount}, {bestdL}, {best_swap}")
-        if icount> 100: break
-        if best_swap is not None:
-            a,b = best_swap
-            K[a], K[b] = K[b], K[a]
-            P[a], P[b] = P[b], P[a]
-            T = tuple(P)
-        else:
+        logger.debug (f"swapping? {icount}, {dL}, {(i, i+1)}")
+        if not dL < 0:
             break
+        K[[i, i+1]] = K[[i+1, i]]
+        P[[i, i+1]] = P[[i+1, i]]
+        for j in (i-1, i+1):
+            if 0 <= j < N-1:
+                seg[j] = hypot_p(P[j], P[j+1])
+        for j in range(max(i-2, 0), min(i+3, N-1)):
+            gen[j] += 1
+            heapq.heappush(heap, (_swap_score(P, seg, j), j, gen[j]))
         
     return K
 
-def find_fenceline_with_userline(d_xy, cmds): #oxy, match_all_ordered_points=False):
+def find_fenceline_with_userline(ws, cmds): #oxy, match_all_ordered_points=False):
     '''
-    determine ordering of points in d_xy to best match points in oxy
+    determine ordering of points in ws to best match points in oxy
     
     Arguments
     ---------
-    d_xy : dictionary of coordinate pairs
-        -   key : well id 
-        -   value : tuple (x,y)
-            world coordinates of the well (x,y) : (real, real).
+    ws : WellSet
+        The well ids and their world coordinates (x,y) : (real, real).
 
     cmds : Namespace as returned by argparse module
         The namespace is defined in xsec_cl.py. The following properties affect
@@ -195,12 +203,13 @@ def find_fenceline_with_userline(d_xy, cmds): #oxy, match_all_ordered_points=Fal
         
     Returns
     -------
-    ordered_wids : list of key values from d_xy ordered along the fenceline
+    order : array of int
+        Indices into ws of the points ordered along the fenceline
     
     Algorithm and details
     ---------------------
-       Create the line segments between points d_xy.  Match each point in oxy to 
-    the nearest line segment, and then compute its position along that segment
+       Create the line segments between points of userline.  Match each point 
+    in ws to the nearest line segment, and then compute its position along that segment
     by finding its normal projection onto the line. If it is near a corner, 
     compute its position along both adjacent segments and take the average.   
     Let the coordinates along each line segment be cummulative, so that the 
@@ -208,147 +217,121 @@ def find_fenceline_with_userline(d_xy, cmds): #oxy, match_all_ordered_points=Fal
     This provides a solution to the problem of one node being closest to several
     wells, yet may have isues near acute corners.  
     
-    d_xy : dict of well location coordinate pairs
-        keys : wid
-        values : pairs of float (float,float)
+    ws.xy : array (N,2) of well location coordinate pairs
     
     userline : list of pairs of float [[float,float],...]
         User defined nodes. Need not correspond exactly with wells in
         number or in location.  Minimum of 2 nodes required.
 
-    Lines : list of Line()
-       The individual directed line segments joining the sorted user nodes 
-       of userline. Together the line segments form a directed polyline, but a   
-       polyline object is never created.  Each segment is given 2 custom 
-       attributes s0 & s1 (float), which are the polyline length coordinates
-       of the starting and ending points of each line segment.
-    -   s0 : float
-            coordinate of segment starting point, measured from the polyline
-            origin.
-    -   s1 : float
-            coordinate of segment ending point, measured from the polyline
-            origin.
+    U : array (M,2)
+       The user nodes of userline. Successive nodes define the individual 
+       directed line segments that together form a directed polyline, but a   
+       polyline object is never created.  
+    
+    V : array (n,2)
+       Direction vectors of the line segments, V[i] = U[i+1] - U[i]
 
     n : int
         Number of line segments in userline
 
-    d : cumulative length of lines.
-
-    knearest : dict
-        Dictionary identifying the user node that is closest to each point in 
-        d_xy
-        -   key : wid (key from d_xy)
-        -   value : int (index of point in oxy)
+    s0 : array (n,) 
+        Cumulative length at the start of each segment, measured along the 
+        entire cross section line from the beginning of the first segment.
     
-    kposition : dict
-        Position of point d_xy along the userline  
-        -   key : wid (key from d_xy)
-        -   value : cumulative position coordinate on userline
-    
-    L.s0 : real
-        Cumulative length at the start of segment L, measuered along the entire 
-        cross section line from the beginning of the first segment.
-    
-    L.s1 : real
-        Cumulative length at the end of segment L, measuered along the entire 
-        cross section line from the beginning of the first segment.
+    s1 : array (n,) 
+        Cumulative length at the end of each segment, measured along the 
+        entire cross section line from the beginning of the first segment.
+
+    knearest : array (N,) of int
+        Index of the user node that is closest to each point in ws, in the
+        order of keys.  Each point is projected only onto the segments 
+        entering and leaving its nearest node; see Xl and Xr.
+
+    pos : array (N,)
+        Position of each point in ws along the userline, in order of keys.
         
-    rl : boolean
+    rl : array (N,) of bool
         Describes point location relative to line segment entering node (left).
         True if normal projection of point onto line falls within end points.
         False if normal projection of point falls beyond endpoints. 
 
-    rr : boolean
+    rr : array (N,) of bool
         Describes point location relative to line segment leaving node (right).
         True if normal projection of point onto line falls within end points.
         False if normal projection of point falls beyond endpoints. 
         
-    Xl : float
+    Xl : array (N,)
         x coordinate of normal projection of point onto line along line segment
         entering node (left). The coordinate may be beyond an endpoint.
 
-    Xr : float
+    Xr : array (N,)
         x coordinate of normal projection of point onto line along line segment
         exiting a node (right). The coordinate may be beyond an endpoint.
     -   
     '''
     userline = cmds.userline
  
-    Lines = [Line((xy0,xy1)) for xy0,xy1 in zip(userline[:-1], userline[1:])] 
-    n = len(Lines)
-    d = 0
-    for L in Lines:   
-        L.s0 = d
-        L.s1 = d + L.length
-        d += L.length
+    # Segment i of userline runs from U[i] to U[i+1], with direction vector
+    # V[i] and length seglen[i]. snodes are the cumulative coordinates of the 
+    # nodes, measured from the origin of userline, computed in one cumsum. 
+    # s0 & s1 are views of snodes at the start and end points of each segment.
+    U = np.asarray(userline, dtype=np.float64)
+    V = U[1:] - U[:-1]
+    n = len(V)
+    seglen = np.hypot(V[:,0], V[:,1])
+    snodes = np.zeros(n+1)
+    np.cumsum(seglen, out=snodes[1:])
+    s0, s1 = snodes[:-1], snodes[1:]
     
-    # find the nearest node on userline to each point on d_xy
-    knearesti = dict() 
-    knearestp = dict() 
-    for k,a in d_xy.items():
-        dmin = np.inf
-        for i,b in enumerate(userline):
-            d = hypot_p(a,b)
-            if d < dmin: 
-                knearesti[k] = i
-                knearestp[k] = a
-                dmin = d
+    # Find the nearest node on userline to each point in ws, and project the
+    # point onto the 1 or 2 segments through that node: the segment entering
+    # the node (left) and the segment leaving it (right). The last segment is
+    # open ended beyond its final node.  Memory use is O(N+M).
+    # With numba, the parallel kernel _fence_positions does both for each 
+    # point in one loop.  Without numba, the few user nodes are looped over, 
+    # each step comparing all points at once, and then the points are 
+    # projected onto their two segments.  Squared distances have the same 
+    # argmin as the distances, so the sqrt is skipped.
+    A = ws.xy
+    if HAVE_NUMBA:
+        pos = _fence_positions(A, U, V, seglen, s0, s1)
+    else:
+        best = np.full(len(A), np.inf)
+        knearest = np.zeros(len(A), dtype=np.int64)
+        for j in range(len(U)):
+            D = A - U[j]
+            D2 = np.einsum('ij,ij->i', D, D)
+            closer = D2 < best
+            best[closer] = D2[closer]
+            knearest[closer] = j
     
-    # find X,Y for each point in d_xy on the 1 or 2 Lines through the 
-    # nearest node on userline
-    kposition = dict()
-    for k,a in d_xy.items():
-        i = knearesti[k]
-        # Try to map the point to each adjacent line. 
-        # This should only fail when the index i is out of range.
-        logger.debug (f"A__: i,k,a= {i}, {k}, {a})")
-        try:
-            assert (i-1) >= 0
-            L = Lines[i-1]
-            Xl,_ = L.XY(a)
-            Xl = Xl + L.s0
-            rl = ((L.s0 <= Xl <= L.s1) 
-                  or (i==0 and Xl < L.s1)) 
-            logger.debug (f"  B: {rl}, {Xl:4.1f}")
-        except Exception as e:
-            rl,Xl = None, None
-            logger.debug ('  C: None, None')
-            
-        try:
-            L = Lines[i]
-            Xr,_ = L.XY(a)
-            Xr = Xr + L.s0
-            rr = ((L.s0 <= Xr <= L.s1)
-                  or (i==n-1 and Xr > L.s0))
-            logger.debug (f'  D: {rr}, {Xr:4.1f}')
-        except Exception as e:
-            rr,Xr = None, None
-            logger.debug ('  E: None, None' )
-
-#         if   rl is not None and rr is None: kposition[k] = Xl
-#         elif rl is None and rr is not None: kposition[k] = Xr
-#         elif Xl is not None and Xr is not None: kposition[k] = (Xl + Xr)/2
-#         elif Xl is not None: kposition[k] = Xl
-#         elif Xr is not None: kposition[k] = Xr
-
-        # if the point maps exclusively to one line (rl xor rr) then take that X  
-        if   rl and not rr: kposition[k] = Xl
-        elif not rl and rr: kposition[k] = Xr
-        
-        # else if the point can map to both lines, take the average X
-        elif Xl and Xr    : kposition[k] = (Xl + Xr)/2
-       
-        # else one of the maps faile, take the X from the map that did not fail
-        elif Xl           : kposition[k] = Xl
-        elif Xr           : kposition[k] = Xr
+        hasl = knearest > 0
+        hasr = knearest < n
+        jl = np.clip(knearest - 1, 0, n-1)
+        jr = np.clip(knearest, 0, n-1)
         
-        else: raise ValueError 
+        def project(jj):
+            """ Return X, the projections onto segments jj, and inside. """
+            X = np.einsum('ij,ij->i', A - U[jj], V[jj]) / seglen[jj] + s0[jj]
+            inside = ((s0[jj] <= X) & (X <= s1[jj])) | ((jj == n-1) & (X > s0[jj]))
+            return X, inside
+        Xl, rl = project(jl)
+        Xr, rr = project(jr)
+        Xl[~hasl] = np.nan
+        Xr[~hasr] = np.nan
+        rl &= hasl
+        rr &= hasr
     
-    # Ordering of points in d_xy is now defined by their sorted values in
-    # kposition[k]  
-    rposition = {v:k for k,v in kposition.items()} 
-    ordered_wids = [rposition[v] for v in sorted(rposition.keys())]
-    return ordered_wids 
+        # if the point maps exclusively to one line (rl xor rr) then take that X;
+        # else take the average X of the adjacent lines that exist.
+        pos = np.where(rl & ~rr, Xl, 
+              np.where(rr & ~rl, Xr, 
+                       np.nanmean(np.stack((Xl, Xr)), axis=0)))
+    
+    # Ordering of points in ws is now defined by their sorted values in
+    # pos. The sort is stable, so wells that share a position are all kept, 
+    # in their ws order.
+    return np.argsort(pos, kind='stable')
         
 def fenceline(d_xy, cmds):  
     '''           
@@ -419,42 +402,60 @@ def fenceline(d_xy, cmds):
         from singleton_section_line import singleton_section_line
         return singleton_section_line (d_xy, cmds)
     
+    # The fenceline geometry works on index orderings into the WellSet ws; 
+    # the well ids are looked up only once the ordering is final.
+    ws = wellset_from_dict(d_xy)
     if cmds.userline:
-        ordered_wids = find_fenceline_with_userline(d_xy, cmds)
-        if len(ordered_wids)>5 and len(ordered_wids)/len(cmds.userline)>2:
-            ordered_wids = fenceline_smooth(d_xy, ordered_wids)
+        order = find_fenceline_with_userline(ws, cmds)
+        if len(order)>5 and len(order)/len(cmds.userline)>2:
+            order = fenceline_smooth(ws, order)
     else:
         from projected_line import find_best_projected_ordering 
         ordered_wids, _ = find_best_projected_ordering(d_xy, cmds)
         logger.debug(f"F1-- {ordered_wids}")
-        ordered_wids = fenceline_smooth(d_xy, ordered_wids)
-        logger.debug(f"F2-- {ordered_wids}")
+        index = {k:i for i,k in enumerate(ws.keys)}
+        order = np.fromiter((index[k] for k in ordered_wids), dtype=np.intp,
+                            count=len(ordered_wids))
+        order = fenceline_smooth(ws, order)
      
-    xy = [d_xy[k] for k in ordered_wids]
+    ordered_wids = ws.keys[order].tolist()
+    logger.debug(f"F2-- {ordered_wids}")
+    xy = ws.xy[order]
     logger.debug (f"xy: {xy}")
     xsecline = Plyline(xy, label='fenceline')
     return ordered_wids, xsecline, None  
 
-def plot_layout(d_xy, polyline, userline, title):
-    """This is a debugging routine to visulize the sectionline in map view"""
-    from matplotlib import pyplot as plt
-    fig, axsL = plt.subplots(1,1)
+def plot_layout(d_xy, polyline, userline, title, fname=None):
+    """
+    This is a debugging routine to visulize the sectionline in map view
+    
+    The figure is built with the object oriented matplotlib interface on an Agg
+    canvas, rather than with pyplot, so repeated calls do not open windows or
+    accumulate figures in pyplot's figure manager.  The figure is written to 
+    png file fname if it is given, and is returned.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure()
+    canvas = FigureCanvasAgg(fig)
+    axsL = fig.add_subplot(111)
     
     logger.debug(f"polyline-X= {polyline.xy[:,0]}")
     logger.debug(f"polyline-Y= {polyline.xy[:,1]}")
     axsL.plot(polyline.xy[:,0], polyline.xy[:,1],
                      color=polyline.linecolor)
     
-    for xy in d_xy.values():
-        axsL.plot(*xy, 'or')
+    # Draw all of the wells with one Line2D rather than one per well. 
+    pts = np.asarray(list(d_xy.values()))
+    axsL.plot(pts[:,0], pts[:,1], 'or', linestyle='')
     if userline is not None:
-        x = [p[0] for p in userline]        
-        y = [p[1] for p in userline]
-        axsL.plot(x,y,'g')
-        axsL.plot(x,y,'g.')
+        ul = np.asarray(userline)
+        axsL.plot(ul[:,0], ul[:,1], 'g-', marker='.')
     axsL.set_aspect('equal')
-    plt.title(title)
-    plt.show()    
+    axsL.set_title(title)
+    if fname:
+        canvas.print_png(fname)
+    return fig
     
 class Cmds():
     """This is only a simulation of command line arguments for testing."""
@@ -479,6 +480,38 @@ class Test(unittest.TestCase):
         cmds.userline = ((0,3),(7,3),(9,0))
         ordered_wids, xsecline, _ = fenceline(d_xy, cmds)
         plot_layout(d_xy, xsecline, cmds.userline, title)
+        # w3 and w5 are nearest the last node, so they project onto the last 
+        # segment, beyond w4 which projects onto the end of the first.
+        self.assertEqual(ordered_wids, ['w1', 'w2', 'w4', 'w3', 'w5'])
+
+    def test_userline_positions(self):
+        # Hand computed positions along the userline, with segments of
+        # length 7 and sqrt(13):
+        #   w0 -2 (before the first node), w1 0, w2 3, w4 7 (left segment
+        #   only), w6 7.03 (average of 6.5 and 7.55 on the segments through
+        #   the corner), w3 8.94, w5 10.05, w7 12.82 (beyond the last node).
+        d_xy = self.d_xy2()
+        d_xy.update({'w0':Coord(-2,3), 'w6':Coord(6.5,2), 'w7':Coord(10,-2)})
+        ws = wellset_from_dict(d_xy)
+        cmds = Cmds()
+        cmds.userline = ((0,3),(7,3),(9,0))
+        order = find_fenceline_with_userline(ws, cmds)
+        self.assertEqual(ws.keys[order].tolist(), 
+                         ['w0', 'w1', 'w2', 'w4', 'w6', 'w3', 'w5', 'w7'])
+
+    def test_fenceline_smooth(self):
+        # Points on the x-axis at x = 0, 3, 1, 2, 4.  Starting from the order
+        # of the keys, the best swap moves x=3 past x=1, then past x=2.
+        ws = wellset_from_dict({k:Coord(x,0) for k,x in enumerate((0,3,1,2,4))})
+        order = fenceline_smooth(ws, np.arange(5))
+        self.assertEqual(order.tolist(), [0, 2, 3, 1, 4])
+        # The end points are swapped if that shortens the line.
+        ws = wellset_from_dict({k:Coord(x,0) for k,x in enumerate((1,0,2,3))})
+        self.assertEqual(fenceline_smooth(ws, np.arange(4)).tolist(), 
+                         [1, 0, 2, 3])
+        # An ordering that is already shortest is kept.
+        order = fenceline_smooth(ws, np.array([1, 0, 2, 3]))
+        self.assertEqual(order.tolist(), [1, 0, 2, 3])
 
     def test_find_fencline_with_smooth(self):
         title = 'find_fencline_with_smooth'
@@ -488,5 +521,4 @@ class Test(unittest.TestCase):
         ordered_wids, xsecline, _ = fenceline(d_xy, cmds)
         plot_layout(d_xy, xsecline, cmds.userline, title)
 if __name__ == "__main__":
-    from xsec_data_abc import Coord
     unittest.main() 
\ No newline at end of file
@@ -5,17 +5,37 @@ Classes
 -------
 Point()
 Plyline()
+PlylineView(Plyline)
 Line(Plyline)
+LineBatch()
+LineProxy(Line)
 Plygon()
 Rectangle(Plygon)
 cRectangle(Rectangle)
+RectangleBatch()
+
+namedtuple objects
+----------
+WellSet
 
 Methods
 -------
 pairRectangles()
+pairRectangles_batch()
+wellset_from_dict()
+njit()
+prange()
 
 Notes
 -----
+o   numba is optional.  If it is installed, njit is numba.njit and can be used
+    to compile small numeric kernels in the section line modules.  If it is not
+    installed, njit returns the decorated function unchanged, so the kernels 
+    should be written with numpy operations that also run well uncompiled.
+    prange is numba.prange, or range without numba. HAVE_NUMBA tells which, 
+    so that a kernel written as explicit loops can be given a numpy 
+    alternative.
+
 o   These are very simple classes. They have the needed coordinate information,
     plus minimal attributes required by the cross section tool, plus basic
     methods required by the cross section tool, plus basic attributes required
@@ -44,8 +64,10 @@ Version
 
 '''
 
+import math
+import sys
+from collections import namedtuple
 import numpy as np
-import unittest
 import logging
 logger = logging.getLogger('geometry_base')
 if __name__ == '__main__':
@@ -53,16 +75,103 @@ if __name__ == '__main__':
     format = '%(asctime)s - %(name)s:%(funcName)s:%(lineno)d - %(levelname)s -- %(message)s')
 logger.setLevel(logging.WARNING)
 
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+    def njit(*args, **kwargs):
+        """ 
+        Stand-in for numba.njit when numba is not installed.
+        
+        Supports both the @njit and the @njit(...) forms.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
 def principle_rad_angle(r):
     """ 
     Shift angle r(in radians) to range (-pi:+pi]
+    
+    r may be a scalar or a numpy array. The shift is the IEEE remainder with 
+    respect to 2*pi, so angles already in range are returned unchanged.  The 
+    remainder may be exactly -pi, which is then shifted to +pi.
     """
-    while r < -np.pi:
-        r += 2*np.pi
-    while r > np.pi:
-        r -= 2*np.pi
+    if isinstance(r, np.ndarray):
+        r = r - 2*np.pi * np.round(r / (2*np.pi))
+        return np.where(r <= -np.pi, r + 2*np.pi, r)
+    r = math.remainder(r, 2*math.pi)
+    if r <= -math.pi:
+        r += 2*math.pi
     return r
+
+def _intern(s):
+    """ 
+    Return label, color and style strings interned, other values unchanged.
+    
+    Many shapes share a few distinct strings; interning keeps one copy of each
+    and lets equality tests short cut on identity.
+    """
+    return sys.intern(s) if type(s) is str else s
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _xy_kernel(xs, ys, x0, y0, c, s):
+    """ 
+    Rotate points (xs,ys) about (x0,y0) by the angle with cosine c and sine s.
+    See Line.XY_batch
+    """
+    n = xs.shape[0]
+    X = np.empty(n)
+    Y = np.empty(n)
+    for i in prange(n):
+        u = xs[i] - x0
+        v = ys[i] - y0
+        X[i] = u*c + v*s
+        Y[i] = v*c - u*s
+    return X, Y
+    
+@njit(cache=True)
+def _seg_snodes(xy, seg, snodes):
+    """ 
+    Fill seg with the segment lengths of polyline xy, and snodes with their 
+    cumulative sum, in one pass.  See Plyline.recompute
+    """
+    s = 0.0
+    snodes[0] = 0.0
+    for i in range(xy.shape[0] - 1):
+        L = math.hypot(xy[i+1,0] - xy[i,0], xy[i+1,1] - xy[i,1])
+        seg[i] = L
+        s += L
+        snodes[i+1] = s
+    return s
+
+WellSet = namedtuple('WellSet', 'keys xy')
+WellSet.__doc__ = """
+    Well locations as a struct of arrays. 
+    
+    -   keys : array (N,) of object
+            The well ids.
+    -   xy : array (N,2) of float
+            World coordinates of the wells, index-aligned with keys.
     
+    An ordering of the wells is an integer index array into keys and xy, so
+    that the ordered well ids are keys[order] and their points are xy[order].
+"""
+
+def wellset_from_dict(d_xy):
+    """
+    Return a WellSet with the keys and coordinate pairs of dictionary d_xy.
+    
+    The keys are stored in an object array so that the original key values,
+    e.g. tuples or mixed types, are kept unchanged. 
+    """
+    keys = np.empty(len(d_xy), dtype=object)
+    keys[:] = list(d_xy.keys())
+    xy = np.asarray(list(d_xy.values()), dtype=np.float64).reshape(-1,2)
+    return WellSet(keys, xy)
+
 class Point:
     """
     A 2-dimensional point
@@ -85,13 +194,14 @@ class Point:
         diameter(?) of the point in drawing units.
     """ 
      
+    __slots__ = ('_x', '_y', 'label', 'pointcolor', 'pointsize')
+     
     def __init__(self, x, y, label='', pointcolor='k', pointsize=1.0):
         self._x = x
         self._y = y
-        self.p = np.array((x,y))
  
-        self.label = label
-        self.pointcolor = pointcolor
+        self.label = _intern(label)
+        self.pointcolor = _intern(pointcolor)
         self.pointsize = pointsize
     
     def __str__(self):
@@ -102,6 +212,11 @@ class Point:
                 f"    label='{self.label}', pointcolor='{self.pointcolor}',",
                 f" pointsize={self.pointsize})")
      
+    @property
+    def p(self):
+        """ np.array((x,y)), constructed on demand """
+        return np.array((self._x, self._y))
+    
     def x(self):
         return self._x
 
@@ -109,7 +224,12 @@ class Point:
         return self._y
     
     def distance (self, other):
-        return np.sqrt((self.x-other.x)**2 + (self.y-other.y)**2)
+        """ Return the distance to Point other """
+        return math.hypot(self._x - other._x, self._y - other._y)
+    
+    def distances (self, xs, ys):
+        """ Return an array of the distances to points with coordinates xs, ys """
+        return np.hypot(np.asarray(xs) - self._x, np.asarray(ys) - self._y)
 
 class Plyline():
     """
@@ -146,24 +266,164 @@ class Plyline():
     -------
     length : float
     
+    from_batch : list of PlylineView
+        Construct many polylines at once.  See from_batch().
+    
+    recompute : None
+        Update the derived attributes after xy is changed in place.
     
+    Notes
+    -----
+    o   segmentlength, snodes, length and centroid are computed on first use,
+        so a polyline that is only drawn never computes them.
+    
+    o   dtype=np.float32 halves the storage of xy and the derived arrays.  
+        float32 resolves projected coordinates (UTM, State Plane) of a few
+        million meters to about half a meter, and local coordinates much 
+        finer, which is ample for drawing.  The default float64 is kept for
+        general and geographic coordinates.
     """
+    __slots__ = ('xy', 'x', 'y', 'label', 'linecolor', 'linethick', 
+                 'linestyle', 'zorder', '_segmentlength', '_snodes', '_length',
+                 '_centroid')
+    
     def __init__(self, xy, label='', 
-                 linecolor='k', linethick=1.0, linestyle='-', zorder=1):
-        self.xy = p = np.array(xy, dtype = float)  
+                 linecolor='k', linethick=1.0, linestyle='-', zorder=1,
+                 dtype=float):
+        self.xy = p = np.array(xy, dtype = dtype, order='C')  
         self.x = p[:,0]
         self.y = p[:,1]
-        self.label = label
-        self.linecolor = linecolor
+        self.label = _intern(label)
+        self.linecolor = _intern(linecolor)
         self.linethick = linethick
-        self.linestyle = linestyle
+        self.linestyle = _intern(linestyle)
         self.zorder = zorder
-        #self.length = np.sum([Line(x1,y1,x2,y2).length for (x1,y1),(x2,y2) in zip ])
-        diffs = self.xy[1:,:] - self.xy[:-1,:]
-        self.segmentlength = np.sqrt(np.sum(diffs**2, 1))
-        self.snodes = np.hstack(([0], np.cumsum(self.segmentlength)))
-        self.length = np.sum(self.segmentlength)
-        self.centroid = np.mean(self.xy,0)
+        self._segmentlength = None
+        self._snodes = None
+        self._length = None
+        self._centroid = None
+
+    @property
+    def segmentlength(self):
+        if self._segmentlength is None:
+            self.recompute()
+        return self._segmentlength
+    @property
+    def snodes(self):
+        if self._snodes is None:
+            self.recompute()
+        return self._snodes
+    @property
+    def length(self):
+        if self._length is None:
+            self.recompute()
+        return self._length
+    @property
+    def centroid(self):
+        if self._centroid is None:
+            self._centroid = self.xy.mean(axis=0)
+        return self._centroid
+
+    def recompute(self, seg_buf=None, snodes_buf=None):
+        """
+        Recompute segmentlength, snodes, length and centroid from xy.
+        
+        Arguments
+        ---------
+        seg_buf : np array (n-1,), float, optional
+            Buffer to hold the segment lengths. Default is segmentlength, or a
+            new array if it was not computed yet.
+        snodes_buf : np array (n,), float, optional
+            Buffer to hold the cumulative distances. Default is snodes, or a 
+            new array if it was not computed yet.
+            
+        Notes
+        -----
+        o   Call this after the nodes are moved in place, e.g. P.xy[k] = (x,y)
+            while dragging a section line.  The number of nodes must not 
+            change.
+            
+        o   Once computed, results are written into existing arrays; no 
+            temporary arrays are made.  dx is written into the segment buffer and dy into 
+            snodes[1:], then the hypotenuse and its cumulative sum overwrite 
+            them.
+        
+        o   With numba, long polylines use a compiled kernel that computes 
+            both in a single pass over xy.  Short ones stay with numpy, where
+            the kernel call overhead would not pay off.
+        """
+        p = self.xy
+        seg = seg_buf if seg_buf is not None else (
+              self._segmentlength if self._segmentlength is not None 
+              else np.empty(len(p) - 1, dtype=p.dtype))
+        snodes = snodes_buf if snodes_buf is not None else (
+                 self._snodes if self._snodes is not None 
+                 else np.empty(len(p), dtype=p.dtype))
+        if HAVE_NUMBA and len(p) > 64:
+            _seg_snodes(p, seg, snodes)
+        else:
+            np.subtract(p[1:,0], p[:-1,0], out=seg)
+            np.subtract(p[1:,1], p[:-1,1], out=snodes[1:])
+            np.hypot(seg, snodes[1:], out=seg)
+            snodes[0] = 0
+            np.cumsum(seg, out=snodes[1:])
+        self._segmentlength = seg
+        self._snodes = snodes
+        self._length = snodes[-1]
+        if self._centroid is not None:
+            np.mean(p, axis=0, out=self._centroid)
+
+    @classmethod
+    def from_batch(cls, offsets, xs, ys, labels=None, **kwargs):
+        """
+        Return a list of M polylines computed together from concatenated nodes.
+        
+        Arguments
+        ---------
+        offsets : array like of int, shape (M+1,)
+            Polyline k has the nodes offsets[k] to offsets[k+1]-1 of xs, ys.
+            offsets[0] = 0, offsets[M] = len(xs), and each polyline must have
+            at least one node.
+        
+        xs, ys : array like of float
+            The concatenated node coordinates of all of the polylines.
+        
+        labels : list of str, or None
+            A label for each polyline.  If None, label is taken from kwargs.
+        
+        kwargs : drawing properties shared by all polylines, as for Plyline.
+        
+        Returns
+        -------
+        list of PlylineView
+        
+        Notes
+        -----
+        o   The segment lengths, snodes, lengths and centroids of all polylines
+            are each computed in one pass over the concatenated arrays.  The 
+            segments joining the last node of one polyline to the first node 
+            of the next are masked to length 0 for the cumulative sums.
+        o   The attributes of each PlylineView are views into the shared 
+            arrays, not copies.
+        """
+        offsets = np.asarray(offsets, dtype=np.intp)
+        counts = np.diff(offsets)
+        assert counts.min() >= 1, 'Each polyline needs at least one node'
+        xy = np.column_stack((xs, ys)).astype(float, copy=False)
+        d = np.diff(xy, axis=0)
+        seg = np.hypot(d[:,0], d[:,1])
+        masked = seg.copy()
+        masked[offsets[1:-1]-1] = 0
+        cs = np.zeros(len(xy))
+        np.cumsum(masked, out=cs[1:])
+        snodes = cs - np.repeat(cs[offsets[:-1]], counts)
+        lengths = snodes[offsets[1:]-1]
+        centroids = np.add.reduceat(xy, offsets[:-1], axis=0) / counts[:,None]
+        if labels is None:
+            labels = [kwargs.pop('label', '')] * len(counts)
+        return [PlylineView(xy[i0:i1], seg[i0:i1-1], snodes[i0:i1], 
+                            lengths[k], centroids[k], label=labels[k], **kwargs)
+                for k, (i0, i1) in enumerate(zip(offsets[:-1], offsets[1:]))]
 
     def repr_properties(self):
         return '\n    '.join(( 
@@ -196,6 +456,30 @@ class Plyline():
             self.str_properties()
         ))
 
+class PlylineView(Plyline):
+    """
+    A Plyline whose arrays are views into arrays shared with other polylines.
+    
+    Constructed by Plyline.from_batch(), which computes the geometry for all
+    of the polylines; it is not recomputed here.
+    """
+    __slots__ = ()
+    
+    def __init__(self, xy, segmentlength, snodes, length, centroid, label='', 
+                 linecolor='k', linethick=1.0, linestyle='-', zorder=1):
+        self.xy = xy
+        self.x = xy[:,0]
+        self.y = xy[:,1]
+        self.label = _intern(label)
+        self.linecolor = _intern(linecolor)
+        self.linethick = linethick
+        self.linestyle = _intern(linestyle)
+        self.zorder = zorder
+        self._segmentlength = segmentlength
+        self._snodes = snodes
+        self._length = length
+        self._centroid = centroid
+
 class Line(Plyline):
     """
     A directed straight line segment.
@@ -211,10 +495,10 @@ class Line(Plyline):
 
     Attributes
     ----------
-    _xy0 : pair of float: tuple, list, or np.array
+    _xy0 : tuple of 2 float
         x and y coordinates of starting point.
 
-    _xy1 : pair of float: tuple, list, or np.array 
+    _xy1 : tuple of 2 float
         x and y coordinates of ending point.
     
     angle : float [radians]
@@ -239,19 +523,33 @@ class Line(Plyline):
         
     length : float
         Return the length of the line
+        
+    XY : (float, float)
+        Return the coordinates of a point in the coordinate system rotated
+        to the line, with origin at xy0.
+    
+    XY_batch : (array, array)
+        As XY, for arrays of points.  Compiled with numba if it is installed.
     """
     
+    __slots__ = ('_xy0', '_xy1', 'angle', '_c', '_s', '_angledeg')
+    
     def __init__(self, xy, **kwargs):
          
-        self._xy0 = np.array(xy[0])
-        self._xy1 = np.array(xy[1])
-        assert np.shape(self._xy0) == (2,), f"self._xy0 {type(self._xy0)}, {self._xy0}"
-        assert np.shape(self._xy1) == (2,)
-            
-        xy = np.vstack((self._xy0, self._xy1))
-        super().__init__(xy, **kwargs)
-        d = self._xy1 - self._xy0
-        self.angle = np.arctan2(d[1], d[0])
+        # Unpacking checks that xy is two (x,y) pairs without a numpy shape
+        # call. The end points are kept as tuples of float; the only array is
+        # the Plyline xy array.
+        try:
+            (x0, y0), (x1, y1) = xy
+        except (TypeError, ValueError):
+            raise ValueError(f"Line needs two (x,y) points, got {xy!r}") from None
+        self._xy0 = x0, y0 = float(x0), float(y0)
+        self._xy1 = x1, y1 = float(x1), float(y1)
+        super().__init__((self._xy0, self._xy1), **kwargs)
+        self.angle = math.atan2(y1 - y0, x1 - x0)
+        self._c = math.cos(self.angle)
+        self._s = math.sin(self.angle)
+        self._angledeg = float(round(math.degrees(self.angle)))
     
     def __str__(self):
         x0,y0 = self.xy0()
@@ -269,9 +567,9 @@ class Line(Plyline):
             super().repr_properties() ))
      
     def p0(self):
-        return self._xy0
+        return np.array(self._xy0)
     def p1(self):           
-        return self._xy1
+        return np.array(self._xy1)
     
     def xy0(self):  
         return self._xy0[0], self._xy0[1]
@@ -279,11 +577,12 @@ class Line(Plyline):
         return self._xy1[0], self._xy1[1]
     
     def anglerad(self):
-        return self.angle + 0 
+        return self.angle
     def angledeg(self):
-        return np.round(self.angle * 180/np.pi, 0)
+        return self._angledeg
     def center(self):
-        return (self._xy0 + self._xy1)/2      
+        return np.array(((self._xy0[0] + self._xy1[0])/2, 
+                         (self._xy0[1] + self._xy1[1])/2))
     
     def XY(self, xy):
         '''
@@ -300,18 +599,160 @@ class Line(Plyline):
             = uc + vs + i(vc -us)
         '''
         u,v = xy[0] - self._xy0[0], xy[1] - self._xy0[1]
-        c,s = np.cos(self.angle), np.sin(self.angle)
+        c,s = self._c, self._s
         X,Y = u*c + v*s, v*c - u*s
         return X,Y
+
+    def XY_batch(self, xs, ys):
+        '''
+        Return arrays X,Y of the points (xs,ys) in the rotated coordinates of XY
+        
+        xs, ys : arrays of float, of equal length. 
+        '''
+        xs = np.ascontiguousarray(xs, dtype=float)
+        ys = np.ascontiguousarray(ys, dtype=float)
+        x0, y0 = float(self._xy0[0]), float(self._xy0[1])
+        if HAVE_NUMBA:
+            return _xy_kernel(xs, ys, x0, y0, self._c, self._s)
+        u, v = xs - x0, ys - y0
+        return u*self._c + v*self._s, v*self._c - u*self._s
+
+class LineBatch():
+    """
+    A batch of directed straight line segments, stored as a struct of arrays.
+
+    Arguments
+    ---------
+    xy0 : array like, shape (N,2), float
+        The x and y coordinates of the starting points.
+
+    xy1 : array like, shape (N,2), float
+        The x and y coordinates of the ending points.
+
+    kwargs : see Plyline. The drawing properties are shared by all lines.
+
+    Attributes
+    ----------
+    x0, y0, x1, y1 : np array (N,), float
+        Coordinates of the starting and ending points. 
+    
+    angle : np array (N,), float [radians]
+        angle of each directed line, measured from the positive horizontal 
+        axis.
+        
+    length : np array (N,), float
+        length of each line.
+    
+    Notes
+    -----
+    o   The coordinates are held in two (N,2) arrays rather than in N Line 
+        objects each with its own small arrays. angle and length are computed
+        for all of the lines at once.
+    
+    o   Indexing or iterating a LineBatch yields LineProxy objects, which are
+        Line objects that read their values from one row of the batch.  So a 
+        LineBatch can be used in place of a list of Line.
+    """
+    def __init__(self, xy0, xy1, label='', 
+                 linecolor='k', linethick=1.0, linestyle='-', zorder=1):
+        self._p0 = np.array(xy0, dtype=float).reshape(-1,2)
+        self._p1 = np.array(xy1, dtype=float).reshape(-1,2)
+        assert self._p0.shape == self._p1.shape
+        self.x0, self.y0 = self._p0[:,0], self._p0[:,1]
+        self.x1, self.y1 = self._p1[:,0], self._p1[:,1]
+        dx, dy = self.x1 - self.x0, self.y1 - self.y0
+        self.angle = np.arctan2(dy, dx)
+        self._cos = np.cos(self.angle)
+        self._sin = np.sin(self.angle)
+        self._angledeg = np.round(np.degrees(self.angle))
+        self.length = np.hypot(dx, dy)
+        self.label = _intern(label)
+        self.linecolor = _intern(linecolor)
+        self.linethick = linethick
+        self.linestyle = _intern(linestyle)
+        self.zorder = zorder
+
+    def __len__(self):
+        return len(self._p0)
+    
+    def __getitem__(self, i):
+        return LineProxy(self, range(len(self))[i])
+
+    def __iter__(self):
+        return (LineProxy(self, i) for i in range(len(self)))
+    
+    def __repr__(self):
+        return f"LineBatch(<{len(self)} lines>, label='{self.label}')"
+
+def _batch_property(name, doc=None):
+    """ Return a property reading row self._i of LineBatch attribute name """
+    return property(lambda self: getattr(self._batch, name)[self._i], doc=doc)
+
+def _shared_property(name):
+    """ Return a property reading the LineBatch attribute name """
+    return property(lambda self: getattr(self._batch, name))
+    
+class LineProxy(Line):
+    """
+    A Line that reads its values from row i of a LineBatch.
+
+    The attributes of Line are provided as read-only properties, so the Line
+    methods work unchanged.  See LineBatch.
+    """
+    __slots__ = ('_batch', '_i')
+    
+    def __init__(self, batch, i):
+        self._batch = batch
+        self._i = i
+
+    _xy0 = _batch_property('_p0')
+    _xy1 = _batch_property('_p1')
+    angle = _batch_property('angle')
+    _c = _batch_property('_cos')
+    _s = _batch_property('_sin')
+    _angledeg = _batch_property('_angledeg')
+    length = _batch_property('length')
+    label = _shared_property('label')
+    linecolor = _shared_property('linecolor')
+    linethick = _shared_property('linethick')
+    linestyle = _shared_property('linestyle')
+    zorder = _shared_property('zorder')
+
+    @property
+    def xy(self):
+        return np.vstack((self._xy0, self._xy1))
+    @property
+    def x(self):
+        return self.xy[:,0]
+    @property
+    def y(self):
+        return self.xy[:,1]
+    @property
+    def segmentlength(self):
+        return self._batch.length[self._i:self._i+1]
+    @property
+    def snodes(self):
+        return np.array((0, self.length))
+    @property
+    def centroid(self):
+        return self.center()
         
 from numbers import Number
 
 class Plygon():
-    def __init__(self, boundary, **kwargs):
+    # The named properties of a Plygon, in the order they are reported.
+    properties = ('code', 'label', 'linecolor', 'linethick', 'linestyle', 
+                  'filled', 'fillcolor', 'pattern', 'patterncolor', 'zorder')
+    __slots__ = ('boundary', '_str_cache', '_repr_cache') + properties
+    
+    def __init__(self, boundary, *, code=None, label='', 
+                 linecolor='k', linethick=1.0, linestyle='-', 
+                 filled=False, fillcolor=None, pattern=None, patterncolor='k',
+                 zorder=1):
         """ Initialize a polygon object with boundar and other properties.
         
             keyword arguments:
-            -   self.boundary  = boundary
+            -   self.code      = code
             -   self.label     = label
             -   self.linecolor = linecolor
             -   self.linethick = linethick
@@ -319,24 +760,48 @@ class Plygon():
             -   self.filled    = filled
             -   self.fillcolor = fillcolor
             -   self.pattern   = pattern
+            -   self.patterncolor = patterncolor
+            -   self.zorder    = zorder
+            
+            Notes
+            -----
+            o   The property strings used by str() and repr() are formatted on
+                first use and cached; the properties should be treated as 
+                read-only after that.
         """
-        self.__dict__.update(kwargs)
-        self.userattributes = dict(kwargs)  # only for information.
+        self.boundary = boundary
+        self.code = _intern(code)
+        self.label = _intern(label)
+        self.linecolor = _intern(linecolor)
+        self.linethick = linethick
+        self.linestyle = _intern(linestyle)
+        self.filled = filled
+        self.fillcolor = _intern(fillcolor)
+        self.pattern = _intern(pattern)
+        self.patterncolor = _intern(patterncolor)
+        self.zorder = zorder
+        self._str_cache = None
+        self._repr_cache = None
  
     def repr_properties(self):
-        rv = []
-        for k,v in self.userattributes.items():
-            if isinstance(v, Number):
-                rv.append(f"{k}={v}")
-            else:
-                rv.append(f"{k}='{v}'")
-        return '\n    '.join(rv)
+        if self._repr_cache is None:
+            rv = []
+            for k in self.properties:
+                v = getattr(self, k)
+                if isinstance(v, Number):
+                    rv.append(f"{k}={v}")
+                else:
+                    rv.append(f"{k}='{v}'")
+            self._repr_cache = '\n    '.join(rv)
+        return self._repr_cache
         
     def str_properties(self):
-        rv =     [f"label='{self.label}'"]
-        rv.append(f"linecolor='{self.linecolor}', linethick='{self.linethick}',linestyle='{self.linestyle}'," )
-        rv.append(f"filled   ='{self.fillcolor is not None}', fillcolor='{self.fillcolor}',pattern='{self.pattern}',patterncolor='{self.patterncolor}')" )
-        return '\n           '.join(rv)              
+        if self._str_cache is None:
+            rv =     [f"label='{self.label}'"]
+            rv.append(f"linecolor='{self.linecolor}', linethick='{self.linethick}',linestyle='{self.linestyle}'," )
+            rv.append(f"filled   ='{self.fillcolor is not None}', fillcolor='{self.fillcolor}',pattern='{self.pattern}',patterncolor='{self.patterncolor}')" )
+            self._str_cache = '\n           '.join(rv)
+        return self._str_cache
 
     def __repr__(self):  
         return "\n".join(("Plygon("+ "    "+str(self.boundary), self.repr_properties()))
@@ -391,6 +856,8 @@ class Rectangle(Plygon):
     o   Degenerate shapes are allowed: having 0 height or 0 width
     """
     
+    __slots__ = ('x', 'y', 'anchor', 'width', 'height', 'xcenter')
+    
     def __init__(self, x, y, **kwargs):
         """ 
         Define a rectangle, with attributes
@@ -444,6 +911,8 @@ class cRectangle(Rectangle):
     xcenter : float
         x coordinate from which to measure offset 
     """    
+    __slots__ = ()
+    
     def __init__(self, x, y, **kwargs):
         """
         Define a rectangle by (x_center, width), (bottom, top), and attributes
@@ -480,6 +949,60 @@ class cRectangle(Rectangle):
                   f" # width = {self.width}, height = {self.height}")
         return '\n'.join((rv, super().str_properties()))
 
+class RectangleBatch():
+    """
+    A batch of rectangles, stored as a struct of arrays.
+
+    Arguments
+    ---------
+    x : array like, shape (N,2), float
+        (xleft, xright) of each rectangle.
+
+    y : array like, shape (N,2), float
+        (ybottom, ytop) of each rectangle.
+
+    kwargs : keyword arguments as for a Plygon. The drawing properties are 
+        shared by all rectangles.
+
+    Attributes
+    ----------
+    x0, x1, y0, y1 : np array (N,), float
+        The left, right, bottom and top of each rectangle.
+    
+    width, height : np array (N,), float
+    
+    Notes
+    -----
+    o   Indexing or iterating a RectangleBatch yields Rectangle objects, made
+        only when they are asked for.  So a RectangleBatch can be used in place
+        of a list of Rectangle.
+    """
+    def __init__(self, x, y, **kwargs):
+        self.x = np.array(x, dtype=float).reshape(-1,2)
+        self.y = np.array(y, dtype=float).reshape(-1,2)
+        assert self.x.shape == self.y.shape
+        self.x0, self.x1 = self.x[:,0], self.x[:,1]
+        self.y0, self.y1 = self.y[:,0], self.y[:,1]
+        self.width = self.x1 - self.x0
+        self.height = self.y1 - self.y0
+        assert np.all(self.width >= 0) and np.all(self.height >= 0)
+        self.kwargs = kwargs
+
+    def __len__(self):
+        return len(self.x)
+    
+    def __getitem__(self, i):
+        i = range(len(self))[i]
+        x0, x1, y0, y1 = self.x[i].tolist() + self.y[i].tolist()
+        return Rectangle((x0, x1), (y0, y1), **self.kwargs)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+    
+    def __repr__(self):
+        return (f"RectangleBatch(<{len(self)} rectangles>, "
+                f"label='{self.kwargs.get('label', '')}')")
+
 def pairRectangles(xc, ri, ro, y, **kwargs):    
     """ 
     Returns two Rectangles, offset left and right from a common X-centerline. 
@@ -501,55 +1024,38 @@ def pairRectangles(xc, ri, ro, y, **kwargs):
     rectRight = Rectangle((xc+ri, xc+ro), y, **kwargs)
     return rectLeft, rectRight
 
-class Test(unittest.TestCase):   
-    def kwargs(self):
-        return {'label':'a_label',
-                'linecolor':'r',
-                'linethick':1,
-                'linestyle':'-',
-                'fillcolor':'g',
-                'pattern':'//',
-                'patterncolor':'r'}
-        
-    def test_principle_rad_angle(self):
-        a = 0.45
-        C = 2*np.pi
-        for m in 1,2,3:
-            r = m*C+a
-            self.assertAlmostEqual( a, principle_rad_angle(m*C+a), 5)
-            self.assertAlmostEqual(-a, principle_rad_angle(m*C-a), 5)
-        print ('principle_rad_angle is OK')
-    def test_Line(self):
-        for ab, c,d,e,f in (( ((0.0, 0.0), (3.0, 4.0)), 'linelabel1', 'k', 2.5, '-'),
-                          ( np.array(((0,0),(3,4))), 'nparraydefinedline', None, None, None),
-                          ( ((0.0, 0.0), (-5.0, 0.0)), 'linelabel3',None, None, None )
-                         ):
-            print ('test_Line\n',ab,c,d,e)
-            L = Line( ab, label=c, linecolor=d, linethick=e)
-            print ('Line:\n  ',L)
-            print ('   line angle, length, center:',L.angle, L.length, L.center())
-    
-    def test_Polyline(self):
-        print ('test_Polyline')
-        xy = np.array(np.arange(12).reshape(6,2))
-        P = Plyline(xy)
-        print ('\nstr(P):\n',P)
-        print ('\nrepr(P):\n',repr(P))
-        print ('centroid',P.centroid)
-    
-    def test_Rectangle(self):
-        print ('test_Rectangle')
-        R = Rectangle( (20, 40), (700,800), **self.kwargs()) 
-        print ('\nstr(Rectangle)=\n',R)
-        
-    def test_cRectangle(self):
-        print ('pairRectangles(xc, ri, ro, y)')
-        xc, ri, ro, y = 100, 20, 30, (700,800)
-        print ('pairRectangles(', xc, ri, ro, y, ')')
-        R = pairRectangles(xc, ri, ro, y, **self.kwargs()) 
-        print (R[0])
-        print (R[1])
-        
+def pairRectangles_batch(xc, ri, ro, y, **kwargs):    
+    """ 
+    Returns the rectangle pairs of pairRectangles for N centerlines at once.
+    
+    Arguments
+    ---------
+    xc, ri, ro : array like, shape (N,), real
+        As for pairRectangles; scalars are broadcast.
+    y : array like, shape (N,2) or (2,), real 
+        (ybottom, ytop) of each pair
+    
+    kwargs : keyword arguments as for a Plygon, shared by all rectangles.
+    
+    Returns
+    -------
+    RectangleBatch of 2N rectangles, ordered left, right, left, right, ...
+    as N calls to pairRectangles would return them.
+    """
+    xc, ri, ro = np.broadcast_arrays(*(np.asarray(a, dtype=float) 
+                                       for a in (xc, ri, ro)))
+    n = xc.size
+    x = np.empty((n, 2, 2))
+    x[:,0,0] = xc - ro
+    x[:,0,1] = xc - ri
+    x[:,1,0] = xc + ri
+    x[:,1,1] = xc + ro
+    y = np.broadcast_to(np.asarray(y, dtype=float).reshape(-1,1,2), (n, 2, 2))
+    return RectangleBatch(x.reshape(-1,2), y.reshape(-1,2), **kwargs)
+
 
 if __name__=='__main__':
-    unittest.main()    
\ No newline at end of file
+    # The tests are in test_geometry_base, so importing geometry_base does not
+    # import unittest.
+    import unittest
+    unittest.main(module='test_geometry_base')
@@ -12,35 +12,29 @@ from qgis.utils  import iface
 from qgis.PyQt.QtCore import QVariant
 import os
 import webbrowser
-import time, pyautogui
+import pyautogui
 
 # Get the list of selected wellids from the selected wells layer
 flayer = iface.activeLayer()
 print (flayer)
-for f in flayer.selectedFeatures():
-    print (f['wellid'])
-wellids = '\t'.join([str(f['wellid']) for f in flayer.selectedFeatures()])
-assert len(wellids) > 0
+wellids = [str(f['wellid']) for f in flayer.selectedFeatures()]
+assert wellids
 
-# Timing delays permit opening multiple logs in different browser windows.  
-# Setting the correct delays is by trial and error.
-opendelay = 1.0
-closedelay = 0.25
+"""
+The url is hard coded here.  Two options are shown.  It is best to start out
+using the 'index' url because that one provides access to all of the others,
+of which only the 'welllog' is provided below.
+""" 
+URL_TMPL = "https://mnwellindex.web.health.state.mn.us/mwi/index.xhtml?wellId={}".format
+#URL_TMPL = "https://mnwellindex.web.health.state.mn.us/mwi/welllog.xhtml?wellId={}".format
 
-for wellid in wellids.split('\t'):
-    """
-    The url is hard coded here.  Two options are shown.  It is best to start out
-    using the 'index' url because that one provides access to all of the others,
-    of which only the 'welllog' is provided below.
-    """ 
-    url = f"https://mnwellindex.web.health.state.mn.us/mwi/index.xhtml?wellId={wellid}"
-    #url = f"https://mnwellindex.web.health.state.mn.us/mwi/welllog.xhtml?wellId={wellid}"
-    
-    print (url)
+# Open every well page as a tab in one pass and let the browser load them in
+# parallel. There are no per-page delays or window switching, so the time 
+# taken does not grow by a second or more per well.
+for wellid in wellids:
+    url = URL_TMPL(wellid)
+    print (wellid, url)
     webbrowser.open_new_tab(url)
-    time.sleep(opendelay)
-    pyautogui.hotkey('alt', 'tab')
-    time.sleep(closedelay)
-    pyautogui.hotkey('ctrl', 'w')
-    pyautogui.hotkey('alt', 'tab')
-    print(f"tab closed {wellid}")
\ No newline at end of file
+
+# Return focus to the calling application once, after all tabs are opened.
+pyautogui.hotkey('alt', 'tab')
@@ -3,9 +3,11 @@ Created on Apr 27, 2021
 
 @author: Bill Olsen
 '''
+import math
 import numpy as np
 
-from geometry_base import  Line, Plyline
+from geometry_base import  Line, Plyline, LineBatch, njit, HAVE_NUMBA, \
+                           wellset_from_dict
 
 import logging
 logger = logging.getLogger('projected_line')
@@ -15,7 +17,7 @@ if __name__ == '__main__':
 logger.setLevel(logging.WARNING)
 # logger.setLevel(logging.DEBUG)
 
-def rotate(x, y, angle):
+def rotate(x, y, angle, out=None):
     """ 
     Rotate (x,y) points counter-clockwise about the origin by angle 
     
@@ -23,18 +25,74 @@ def rotate(x, y, angle):
     ---------
     x,y : scalar numbers or numpy vectors
     angle : scalar number (radians)
+    out : (array, array), optional
+        Float arrays with the broadcast shape of x and y, to receive X,Y. They
+        must not share memory with x or y.
     
     Returns
     -------
-    X,Y : same type and shape as x,y
+    X,Y : scalars if x and y are scalars and out is not given, else arrays 
+          with the broadcast shape of x and y.
         Points (x,y) are rotated by angle about the point (x,y)=(0,0).
         A positive angle causes counter-clockwise rotation.
+        
+    Notes
+    -----
+    o   For arrays, each product is written with out= into X, Y, or one 
+        scratch array of their shape.  So a call makes one temporary array, 
+        plus X and Y if out is not given.
     """
     c,s = np.cos(angle), np.sin(angle)
-    X = x*c - y*s
-    Y = y*c + x*s
+    if out is None:
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            return x*c - y*s, y*c + x*s
+        shape = np.broadcast(x, y).shape
+        out = (np.empty(shape), np.empty(shape))
+    X, Y = out
+    T = np.empty(np.shape(X))
+    np.multiply(y, s, out=T)
+    np.multiply(x, c, out=X)
+    np.subtract(X, T, out=X)
+    np.multiply(x, s, out=T)
+    np.multiply(y, c, out=Y)
+    np.add(Y, T, out=Y)
     return X, Y
 
+def rotation_matrix(angle):
+    """ 
+    Return the 2x2 matrix that rotates column vectors (x,y) as rotate() does
+    
+    Arguments
+    ---------
+    angle : scalar number (radians)
+    
+    Returns
+    -------
+    R : np array (2,2)
+        R @ np.vstack((x,y)) is np.vstack(rotate(x,y,angle))
+    """
+    c,s = np.cos(angle), np.sin(angle)
+    return np.array(((c, -s), 
+                     (s,  c)))
+
+def rotate_complex(z, angle, out=None):
+    """ 
+    Rotate points z = x + iy counter-clockwise about the origin by angle 
+    
+    Arguments
+    ---------
+    z : complex scalar or numpy complex vector
+    angle : scalar number (radians)
+    out : numpy complex array, optional
+        Array of the shape of z to receive the result.
+    
+    Returns
+    -------
+    Z : same type and shape as z
+        z * exp(i*angle), the same rotation as rotate() on (z.real, z.imag).
+    """
+    return np.multiply(z, complex(math.cos(angle), math.sin(angle)), out=out)
+
 def translate(x, y, dx, dy):
     """ 
     Translate (x,y) by distance (dx, dy)
@@ -95,8 +153,8 @@ def projected_section_line(d_xy, cmds): #orderedkeys=None, theta=None, max_del_t
         Nodes are the world coordinates of the points along the straight line  
         that the wells project onto.   
 
-    projectionlines : list (line) 
-        List of straight line segments normal to the section line
+    projectionlines : LineBatch 
+        Straight line segments normal to the section line
         and leading to each well in the list.
         
     Notes
@@ -174,6 +232,11 @@ def find_best_projected_ordering(d_xy, cmds): #option='fenceline'):
         loop rotations.
     -   Return the list of wids in the order of their X-coordinates in their 
         final completely rotated state. 
+    -   If the points lie on a line along the rotated Y-axis (e.g. wells on a
+        north-south line with no userangle), the best fit line is vertical and
+        the rotation is always +pi/2, limited by the constraint.  The wells
+        are then ordered by increasing Y.  The polyfit version turned either
+        way, depending on round off in the centering.
     '''
     # angle tolerance is 1 degree
     tol = np.pi/180
@@ -188,57 +251,100 @@ def find_best_projected_ordering(d_xy, cmds): #option='fenceline'):
         else:
             angle_constraint = cmds.userangle_constraint
 
-    # Extract keys and x,y points from d_xy into ordered lists.
-    # The order doesn't matter, except it must remain the same in all 3 lists. 
-    x,y,wid = [],[],[]
+    # Extract keys and x,y points from d_xy into index-aligned arrays.
     logger.debug(f"Entering: pointcount={len(d_xy)}, cmds={cmds}")
-    for key,coord in d_xy.items():
-        if len(d_xy) < 4: 
-            logger.debug (f"starting: {key} {coord}")
-        x.append(coord.x)
-        y.append(coord.y)
-        wid.append(key)
-    x = np.array(x)
-    y = np.array(y)
-
-    # Center both x and y arrays on their centroids.  This has the effect of 
+    ws = wellset_from_dict(d_xy)
+
+    # Center the x,y points on their centroid.  This has the effect of 
     # translating the x,y points so that their centroid is at (0,0) in the local
-    # X,Y coordinate system.
-    xc, yc = np.mean(x), np.mean(y)
-    X, Y = translate(x, y, -xc, -yc)
+    # X,Y coordinate system. The centroid is taken in one pass over xy.
+    xyc = ws.xy.mean(axis=0)
+    X, Y = (ws.xy - xyc).T
 
     # Rotate the x,y points about the origin by -angle0. A line at userangle
     # through the centroid in world coordinates, now lies on the X-axis in the 
     # local XY coordinate system. Rotations in the iterative steps are all made
-    # relative to these initial rotated positions, denoted X0,Y0   
-    X0,Y0 = rotate(X,Y,-angle0)
-    theta = 0
-    logger.debug(f"    step {0}, dtheta={0:8.4f},  A={np.degrees(theta+angle0):8.4f},     C={np.degrees(angle_constraint):5.4f}")
+    # relative to these initial rotated positions, denoted XY0 = (X0,Y0). 
+    # The points are stacked as a (2,N) array so that each rotation is a 
+    # single product with a 2x2 rotation matrix.
+    XY0 = rotation_matrix(-angle0) @ np.vstack((X, Y))
+    logger.debug("    step %d, dtheta=%8.4f,  A=%8.4f,     C=%5.4f", 
+                 0, 0, math.degrees(angle0), math.degrees(angle_constraint))
+    if XY0.shape[1] == 2:
+        # The best fit line through two points passes through both, so its 
+        # angle is known without iterating. It is taken in (-pi/2, pi/2], as 
+        # the iteration would give it, then limited by the angle constraint.
+        dX, dY = XY0[:,1] - XY0[:,0]
+        if abs(dX) > 1e-9 * abs(dY):
+            theta = math.atan(dY/dX)
+        else:
+            theta = np.pi/2
+        theta = min(max(theta, -angle_constraint), angle_constraint)
+    elif HAVE_NUMBA:
+        theta = _fit_angle_kernel(XY0, angle_constraint, tol)
+    else:
+        theta = _fit_angle(XY0, angle_constraint, tol, angle0)
+
+    # Recompute the node ordering using the final angle theta
+    X = rotation_matrix(-theta)[0] @ XY0
+    ordered_wid = ws.keys[np.argsort(X, kind='stable')].tolist()
+    finaltheta = theta + angle0
+  
+    return ordered_wid, finaltheta  
+
+def _fit_angle(XY0, angle_constraint, tol, angle0=0):
+    """
+    Return the rotation theta of the best fit line through the points XY0.
     
+    Arguments
+    ---------
+    XY0 : np array (2,N), float
+        Points centered on the origin, rotated so that X is along the userangle
+    angle_constraint : float [radians]
+        Maximum absolute value of theta.
+    tol : float [radians]
+        Iteration stops when a step changes theta by less than tol.
+    angle0 : float [radians]
+        The userangle; only used in the debug log. 
+        
+    Notes
+    -----
+    o   See find_best_projected_ordering().  _fit_angle_kernel() is the same
+        iteration written as loops for numba.
+    """
+    theta = 0
+    # The points are held as complex numbers Z0 = X0 + iY0, so a rotation is 
+    # one complex multiply.  The rotated points are written into one scratch
+    # array on each step, and X,Y are views of its real and imaginary parts.
+    Z0 = XY0[0] + 1j*XY0[1]
+    Z = np.empty_like(Z0)
     istep=1  
-    errcount, nudge = 0, 0.01  
     while istep < 20: # Let's not loop forever if there is a bug.
-        X,Y = rotate(X0,Y0, -theta)
+        # The first step fits the points as given, so the common case of a 
+        # userangle that is already on the best fit line exits after one fit
+        # and no rotations.
+        if istep == 1:
+            X,Y = XY0
+        else:
+            rotate_complex(Z0, -theta, out=Z)
+            X,Y = Z.real, Z.imag
         # logger.debug(f"    step {istep}    X = {X},  Y = {Y}, theta={np.degrees(theta)}, A={np.degrees(theta+angle0)}")
-        try:
-            p = np.polyfit(X, Y, 1)
-        except:
-            # We suppose that numpy has thrown np.linalg.LinAlgError because 
-            # we have tried to fit a vertical line. But we cannot always catch
-            # that error by name. Under Python3.8, numpy 1.21.4, this produces
-            # a ValueError that is not reported using the normal error reporting
-            # mechanism, so we cannot catch it explicitly.
-            if errcount >4:
-                break
-            theta += nudge
-            nudge = -nudge
-            errcount += 1
-            continue           
-            
-        f = np.poly1d(p)            # f is a linear polynomial
-        theta1 = np.arctan2(f(1),1) # theta1 is slope of the line in rad from +x
+        # X,Y remain centered on the origin, so the least squares line passes
+        # through it and its slope is sxy/sxx.  If the spread of X is below 
+        # 1e-9 of the spread of Y, the X values are only round off from the
+        # centering, and the points lie on the Y-axis.  The best fit line is
+        # then vertical, and is turned by +pi/2, as the polyfit version did.
+        sxx = X @ X
+        sxy = X @ Y
+        if sxx > 1e-18 * (Y @ Y):
+            theta1 = np.arctan2(sxy, sxx) # theta1 is slope of the line in rad from +x
+        else:
+            theta1 = np.pi/2
         theta += theta1
-        logger.debug(f"    step {istep}, dtheta={np.degrees(theta1):8.4f},  A={np.degrees(theta+angle0):8.4f}, theta={np.degrees(theta):5.4f}")
+        # Formatted by logging only if DEBUG is enabled.
+        logger.debug("    step %d, dtheta=%8.4f,  A=%8.4f, theta=%5.4f", 
+                     istep, math.degrees(theta1), math.degrees(theta+angle0), 
+                     math.degrees(theta))
         if theta <= -angle_constraint:
             theta = -angle_constraint
             break
@@ -247,14 +353,41 @@ def find_best_projected_ordering(d_xy, cmds): #option='fenceline'):
             break
         elif np.abs(theta1) < tol:
             break
-        istep += 1    
+        istep += 1
+    return theta
 
-    # Recompute the node ordering using the final angle theta
-    X,Y = rotate(X0,Y0, -theta)
-    ordered_wid = [wid[i] for i in np.argsort(X)]
-    finaltheta = theta + angle0
-  
-    return ordered_wid, finaltheta  
+@njit(cache=True)
+def _fit_angle_kernel(XY0, angle_constraint, tol):
+    """ 
+    Compiled version of _fit_angle(), used if numba is installed.
+    
+    The rotation by -theta and the sums sxx and sxy are computed in one loop
+    over the points, without temporary arrays.
+    """
+    theta = 0.0
+    for istep in range(1, 20): 
+        c, s = math.cos(theta), math.sin(theta)
+        sxx = 0.0
+        sxy = 0.0
+        syy = 0.0
+        for i in range(XY0.shape[1]):
+            X = XY0[0,i]*c + XY0[1,i]*s
+            Y = XY0[1,i]*c - XY0[0,i]*s
+            sxx += X*X
+            sxy += X*Y
+            syy += Y*Y
+        if sxx > 1e-18 * syy:
+            theta1 = math.atan2(sxy, sxx)
+        else:
+            theta1 = math.pi/2
+        theta += theta1
+        if theta <= -angle_constraint:
+            return -angle_constraint
+        elif theta >= angle_constraint:
+            return angle_constraint
+        elif abs(theta1) < tol:
+            break
+    return theta
 
 def projected_section_line_given(d_xy, cmds):
     '''           
@@ -283,8 +416,8 @@ def projected_section_line_given(d_xy, cmds):
         The end-points are the right-angle projections of the first and last 
         points of the ordered point list.
     
-    projectionlines : list (line) 
-        List of straight line segments normal to the section line and leading
+    projectionlines : LineBatch 
+        Straight line segments normal to the section line and leading
         to each well in the list.
     
     spacing : numpy vector array
@@ -300,15 +433,8 @@ def projected_section_line_given(d_xy, cmds):
         but provision is not made here for adjusting the projection lines to
         correspond to such adjusment.
     '''            
-    x,y,wid = [],[],[]
-    for key,coord in d_xy.items():
-        if len(d_xy) < 4:
-            logger.debug (f"projected_section_line_given: {key}, {coord}")
-        x.append(coord.x)
-        y.append(coord.y)
-        wid.append(key)
-
-    xy = np.array(list([v.x, v.y] for v in d_xy.values()))
+    ws = wellset_from_dict(d_xy)
+    xy = ws.xy
     
     if cmds.userline:
         userLine = Line(cmds.userline)
@@ -320,29 +446,21 @@ def projected_section_line_given(d_xy, cmds):
     else:
         raise AttributeError('userline or userangle is required in cmds')
     
-    # Translate the line center to the origin (0,0) in the X,Y plane. 
-    xc, yc = xyc[0], xyc[1]
-    X, Y = translate(x, y, -xc, -yc)
-    
-    # Rotate the X,Y points about the origin by angle -alpha into the U,V plane. 
-    # This rotates the section line onto the horizontal (U) axis.
-    U, V = rotate(X, Y, -alpha)
-
-    # Project points U,V onto points Up,Vp that lie on the U-axis. This is easy
-    # because Up stays equal to U, and Vp is just set to 0     
-    Up, Vp = U, V*0  
-
-    # Unrotate points Up,Vp back to the XY plane
-    Xp, Yp = rotate(Up, Vp, alpha) 
-
-    # Un-translate points Xp,Yp back to the xy plane
-    xp, yp = translate(Xp, Yp, xc, yc)
-    xyp = np.array([xp,yp]).T
+    # Project the points onto the section line, which passes through xyc with
+    # unit direction u. Up is the distance of each projected point along the 
+    # line from xyc, i.e. the U coordinate after translating xyc to the origin
+    # and rotating the section line onto the U axis.  The projected points are
+    # xyc + Up*u, so there is no need to rotate and translate them back. 
+    u = np.array((np.cos(alpha), np.sin(alpha)))
+    Up = (xy - xyc) @ u
+    xyp = xyc + Up[:,None] * u
     
     # Determine the order of identifiers along the projected section line.
-    # And identify the indices of the endpoints.
-    psort = np.argsort(Up)
-    ordered_wids = [wid[i] for i in psort]
+    # The full order is needed for ordered_wids and the section line nodes, 
+    # so this is a sort and not an argpartition for the endpoints only. A 
+    # stable sort keeps wells that project to the same point in d_xy order.
+    psort = np.argsort(Up, kind='stable')
+    ordered_wids = ws.keys[psort].tolist()
     
     # The projection line is defined by the points xyp on it, which have to be
     # reordered in order psort.
@@ -354,10 +472,9 @@ def projected_section_line_given(d_xy, cmds):
     # line for readability, and have to define pseudo-normals.  These normals
     # are for debugging, so we can visualize whether the projection algorithm is 
     # working correctly.
-    normals = []
-    for i, wid in enumerate(ordered_wids):
-        p0, p1 = d_xy[wid], xyp[i,:] 
-        normals.append( Line((p0,p1), label='normal') )
+    # The well points are taken from xy with the same index as xyp, rather 
+    # than looked up in d_xy one well at a time.
+    normals = LineBatch(xy[psort], xyp, label='normal')
 
     return ordered_wids, projectionline, normals  
 
@@ -379,24 +496,41 @@ def update_projection_line_nodes(pline, Xnodes):
     -------
     pline : Plyline
         Node spacing along xypline is proportional to spacing in Xnodes.
+        The end points do not move. The segment lengths and snodes are
+        recomputed.  If all Xnodes are equal, pline is not changed.
     """
-    x0, x1 = pline.x[0], pline.x[-1]
-    y0, y1 = pline.y[0], pline.y[-1]
     dX = np.ptp(Xnodes)
-    s = (Xnodes-Xnodes[0])/dX
-    pline.xy[:,0] = x0 + s*(x1-x0)
-    pline.xy[:,1] = y0 + s*(y1-y0)
+    if dX == 0:
+        return
+    xy0 = pline.xy[0].copy()
+    dxy = pline.xy[-1] - xy0
+    s = (Xnodes - Xnodes[0]) / dX
+    # Both columns are written at once, directly into pline.xy.
+    np.multiply(s[:,None], dxy, out=pline.xy)
+    pline.xy += xy0
+    # The nodes moved in place, so refresh the cached lengths.
+    pline.recompute()
     
 ################################################################################
 ############################       TESTING      ################################
 
         
 if __name__ == '__main__':
+    import argparse
     from dataclasses import dataclass    
     from xsec_data_abc import Coord
 
+    # The cases below are always computed, but only plotted with --visualize,
+    # so that a headless run does not import matplotlib.
+    parser = argparse.ArgumentParser(description='projected_line test cases')
+    parser.add_argument('--visualize', action='store_true',
+                        help='plot each test case in map view')
+    args = parser.parse_args()
+
     def plot_layout(d_xy, xsecline, theta, normals, title):
         """This is a debugging routine to visulize the sectionline in map view"""
+        if not args.visualize:
+            return
         from matplotlib import pyplot as plt
         fig, axsL = plt.subplots(1,1)  
         
@@ -409,8 +543,8 @@ if __name__ == '__main__':
             for n in normals:
                 axsL.plot(n.xy[:,0], n.xy[:,1], 'b')
         
-        for xy in d_xy.values():
-            axsL.plot(*xy, 'or')
+        pts = np.asarray(list(d_xy.values()))
+        axsL.plot(pts[:,0], pts[:,1], 'or', linestyle='')
         axsL.set_aspect('equal')
         plt.title(title)
         plt.show()    
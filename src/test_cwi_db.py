@@ -0,0 +1,28 @@
+'''
+Tests for the cwi_db database connection
+
+Run from the src directory with
+    python -m unittest test_cwi_db
+'''
+
+import unittest
+from cwi_db import DB_SQLite
+
+
+class Test(unittest.TestCase):
+    def test_bulk_insert(self):
+        db = DB_SQLite(':memory:', open_db=True)
+        db.cur.execute("create table t (a integer, b text);")
+        db.cur.execute("PRAGMA synchronous=FULL;")
+        rows = ((i, str(i)) for i in range(2500))
+        n = db.bulk_insert('t', ['a', 'b'], rows, chunk=1000)
+        self.assertEqual(n, 2500)
+        self.assertEqual(db.cur.execute("select count(*), sum(a) from t;").fetchone(),
+                         (2500, sum(range(2500))))
+        # The synchronous setting before the load is restored.
+        self.assertEqual(db.cur.execute("PRAGMA synchronous;").fetchone()[0], 2)
+        db.close_db()
+
+
+if __name__=='__main__':
+    unittest.main()
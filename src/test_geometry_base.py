@@ -0,0 +1,135 @@
+'''
+Tests for the geometry_base shapes
+
+Run from the src directory with
+    python -m unittest test_geometry_base
+or
+    python geometry_base.py
+'''
+
+import unittest
+import numpy as np
+from geometry_base import (principle_rad_angle, Line, Plyline, LineBatch, 
+                           Rectangle, pairRectangles, pairRectangles_batch)
+
+
+class Test(unittest.TestCase):   
+    def kwargs(self):
+        return {'label':'a_label',
+                'linecolor':'r',
+                'linethick':1,
+                'linestyle':'-',
+                'fillcolor':'g',
+                'pattern':'//',
+                'patterncolor':'r'}
+        
+    def test_principle_rad_angle(self):
+        a = 0.45
+        C = 2*np.pi
+        for m in 1,2,3:
+            r = m*C+a
+            self.assertAlmostEqual( a, principle_rad_angle(m*C+a), 5)
+            self.assertAlmostEqual(-a, principle_rad_angle(m*C-a), 5)
+        print ('principle_rad_angle is OK')
+    def test_Line(self):
+        for ab, c,d,e,f in (( ((0.0, 0.0), (3.0, 4.0)), 'linelabel1', 'k', 2.5, '-'),
+                          ( np.array(((0,0),(3,4))), 'nparraydefinedline', None, None, None),
+                          ( ((0.0, 0.0), (-5.0, 0.0)), 'linelabel3',None, None, None )
+                         ):
+            print ('test_Line\n',ab,c,d,e)
+            L = Line( ab, label=c, linecolor=d, linethick=e)
+            print ('Line:\n  ',L)
+            print ('   line angle, length, center:',L.angle, L.length, L.center())
+    
+    def test_Polyline(self):
+        print ('test_Polyline')
+        xy = np.array(np.arange(12).reshape(6,2))
+        P = Plyline(xy)
+        print ('\nstr(P):\n',P)
+        print ('\nrepr(P):\n',repr(P))
+        print ('centroid',P.centroid)
+        P.xy[3] = (20, -4)
+        P.recompute()
+        Q = Plyline(P.xy)
+        np.testing.assert_array_equal(P.snodes, Q.snodes)
+        np.testing.assert_array_equal(P.centroid, Q.centroid)
+        self.assertEqual(P.length, Q.length)
+    
+    def test_LineBatch(self):
+        # Each row of a LineBatch must act as the Line it replaces, including
+        # vertical, reversed and zero length lines.
+        xy0 = ((0, 0), (3, 4), (5, -2), (1, 1), (-7.5, 2.25))
+        xy1 = ((3, 4), (3, 9), (-1, -2), (1, 1), (4.5, -6.75))
+        B = LineBatch(xy0, xy1, label='a_label', linecolor='r')
+        self.assertEqual(len(B), len(xy0))
+        pts = np.array(((2.0, 1.0), (-3.0, 5.5), (10.0, -4.0)))
+        for i, P in enumerate(B):
+            L = Line((xy0[i], xy1[i]), label='a_label', linecolor='r')
+            for P_ in (P, B[i]):
+                np.testing.assert_array_equal(P_.xy, L.xy)
+                self.assertEqual(P_.angle, L.angle)
+                self.assertEqual(P_.angledeg(), L.angledeg())
+                self.assertEqual(P_.length, L.length)
+                self.assertEqual(P_.xy0(), L.xy0())
+                self.assertEqual(P_.xy1(), L.xy1())
+                np.testing.assert_array_equal(P_.center(), L.center())
+                np.testing.assert_array_equal(P_.snodes, L.snodes)
+                np.testing.assert_array_equal(P_.segmentlength, L.segmentlength)
+                self.assertEqual(P_.XY(pts[0]), L.XY(pts[0]))
+                np.testing.assert_allclose(P_.XY_batch(pts[:,0], pts[:,1]),
+                                           L.XY_batch(pts[:,0], pts[:,1]))
+                self.assertEqual((P_.label, P_.linecolor), 
+                                 (L.label, L.linecolor))
+        self.assertEqual(B[-1].length, B[len(B)-1].length)
+    
+    def test_Plyline_from_batch(self):
+        # Polylines of 1, 2, 4 and 3 nodes, computed together, must match the
+        # polylines computed one at a time.
+        nodes = (((4, 4),),
+                 ((0, 0), (3, 4)),
+                 ((1, 1), (1, 5), (-2, 9), (-2, 9)),
+                 ((10, -3), (7.5, 0.5), (12, 2)))
+        offsets = np.cumsum([0] + [len(p) for p in nodes])
+        xy = np.concatenate([np.array(p, dtype=float) for p in nodes])
+        labels = [f'p{k}' for k in range(len(nodes))]
+        V = Plyline.from_batch(offsets, xy[:,0], xy[:,1], labels=labels, 
+                               linecolor='g')
+        self.assertEqual(len(V), len(nodes))
+        for k, p in enumerate(nodes):
+            P = Plyline(p, label=f'p{k}', linecolor='g')
+            np.testing.assert_array_equal(V[k].xy, P.xy)
+            np.testing.assert_allclose(V[k].segmentlength, P.segmentlength)
+            np.testing.assert_allclose(V[k].snodes, P.snodes)
+            self.assertAlmostEqual(V[k].length, P.length)
+            np.testing.assert_allclose(V[k].centroid, P.centroid)
+            self.assertEqual((V[k].label, V[k].linecolor), 
+                             (P.label, P.linecolor))
+        
+    def test_Rectangle(self):
+        print ('test_Rectangle')
+        R = Rectangle( (20, 40), (700,800), **self.kwargs()) 
+        print ('\nstr(Rectangle)=\n',R)
+        
+    def test_cRectangle(self):
+        print ('pairRectangles(xc, ri, ro, y)')
+        xc, ri, ro, y = 100, 20, 30, (700,800)
+        print ('pairRectangles(', xc, ri, ro, y, ')')
+        R = pairRectangles(xc, ri, ro, y, **self.kwargs()) 
+        print (R[0])
+        print (R[1])
+        
+    def test_pairRectangles_batch(self):
+        xc, ri, ro = (100, 200, 300), (20, 10, 5), (30, 15, 25)
+        y = ((700, 800), (650, 700), (600, 900))
+        B = pairRectangles_batch(xc, ri, ro, y, **self.kwargs())
+        self.assertEqual(len(B), 6)
+        for i in range(3):
+            for R, b in zip(pairRectangles(xc[i], ri[i], ro[i], y[i]),
+                            (B[2*i], B[2*i+1])):
+                self.assertEqual(tuple(R.x), tuple(b.x))
+                self.assertEqual(tuple(R.y), tuple(b.y))
+        self.assertEqual(B[-1].label, 'a_label')
+
+
+if __name__=='__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+'''
+Tests for the projected_line geometry functions
+
+Run from the src directory with
+    python -m unittest test_projected_line
+'''
+
+import unittest
+from argparse import Namespace
+import numpy as np
+from xsec_data_abc import Coord
+from projected_line import (rotate, rotate_complex, rotation_matrix, 
+                            find_best_projected_ordering, _fit_angle)
+
+
+class Test(unittest.TestCase):
+    def test_rotate(self):
+        x, y = np.array((1.0, 0.0, 3.0)), np.array((0.0, 2.0, -1.0))
+        X, Y = rotate(x, y, np.pi/2)
+        np.testing.assert_allclose(X, -y, atol=1e-12)
+        np.testing.assert_allclose(Y, x, atol=1e-12)
+        Z = rotate_complex(x + 1j*y, np.pi/2)
+        np.testing.assert_allclose(Z.real, X, atol=1e-12)
+        np.testing.assert_allclose(Z.imag, Y, atol=1e-12)
+        
+    def test_rotate_scalar_and_array_out(self):
+        # A scalar x with an array y, written into out arrays.
+        x, y = 2.0, np.array((0.0, 1.0, -1.0))
+        out = (np.empty(3), np.empty(3))
+        X, Y = rotate(x, y, np.pi/2, out=out)
+        self.assertIs(X, out[0])
+        self.assertIs(Y, out[1])
+        np.testing.assert_allclose(X, -y, atol=1e-12)
+        np.testing.assert_allclose(Y, (2.0, 2.0, 2.0), atol=1e-12)
+        X, Y = rotate(x, y, np.pi/2)
+        np.testing.assert_allclose(X, -y, atol=1e-12)
+        np.testing.assert_allclose(Y, (2.0, 2.0, 2.0), atol=1e-12)
+        X, Y = rotate(1.0, 0.0, np.pi/2)
+        self.assertAlmostEqual(X, 0.0)
+        self.assertAlmostEqual(Y, 1.0)
+
+    def test_vertical_wells_turn_positive(self):
+        # Wells on a north-south line, in UTM-sized coordinates, so that the
+        # centered X are round off.  The fit turns by +pi/2, limited by the
+        # constraint, and the wells are ordered south to north.
+        ys = (5012046.0, 5012747.97, 5010137.8, 5013767.57, 5012690.72,
+              5011648.66, 5013942.14)
+        d_xy = {f'w{i}': Coord(456789.37, y) for i, y in enumerate(ys)}
+        cmds = Namespace(userangle=None, userangle_constraint=None)
+        wids, theta = find_best_projected_ordering(d_xy, cmds)
+        self.assertAlmostEqual(theta, 0.99 * np.pi/2)
+        self.assertEqual(wids, [f'w{i}' for i in np.argsort(ys)])
+        # The numpy iteration, whether or not numba is installed.
+        xy = np.array([tuple(c) for c in d_xy.values()])
+        XY0 = rotation_matrix(0) @ (xy - xy.mean(axis=0)).T
+        self.assertAlmostEqual(_fit_angle(XY0, 0.99 * np.pi/2, np.pi/180), 
+                               0.99 * np.pi/2)
+
+
+if __name__=='__main__':
+    unittest.main()
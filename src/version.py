@@ -34,4 +34,4 @@ Version 0.4  2022-09-20
 @author: Bill Olsen
 '''
 
-__version__ = 0.3
\ No newline at end of file
+__version__ = "0.4"
\ No newline at end of file
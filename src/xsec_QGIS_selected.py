@@ -41,7 +41,11 @@ Not yet implemented:
     There is no way for the user to suggest the line orientation. 
 """
 from qgis.utils  import iface
-from qgis.PyQt.QtCore import QVariant
+# Import the qgis.core names that are used, rather than relying on those that
+# the QGIS python console puts in the script namespace.
+from qgis.core import (QgsExpressionContextUtils, QgsFeature, QgsFeatureRequest,
+                       QgsFeatureSink, QgsFeatureSource, QgsGeometry, 
+                       QgsPointXY, QgsProject, QgsVectorDataProvider)
 import os
 
 import xsec_cl
@@ -62,15 +66,23 @@ legend_db = None
 # Get the list of selected wellids from the selected wells layer
 flayer = iface.activeLayer()
 print (flayer)
-for f in flayer.selectedFeatures():
-    print (f['wellid'])
-wellids = ' '.join([str(f['wellid']) for f in flayer.selectedFeatures()])
+# Read the selected features once, fetching only the wellid attribute and no
+# geometry.
+request = (QgsFeatureRequest()
+           .setFilterFids(flayer.selectedFeatureIds())
+           .setSubsetOfAttributes(['wellid'], flayer.fields())
+           .setFlags(QgsFeatureRequest.NoGeometry))
+wellids = [str(f['wellid']) for f in flayer.getFeatures(request)]
+for wid in wellids:
+    print (wid)
 assert len(wellids) > 0
 
-# Compose the command line, convert it to cmds, and call xsec_Main()
-commandline = f"-p -i {wellids}"
+# Compose the command line as a list, convert it to cmds, and call xsec_Main().
+# The list is parsed directly; the string form is kept only for xcommand.
+args = ['-p', '-i', *wellids]
+commandline = ' '.join(args)
 print (commandline)
-cmds = xsec_cl.xsec_parse_args(commandline)
+cmds = xsec_cl.xsec_parse_args(args)
 xsec =  Xsecmain(cmds, db_name = wells_db)
 
 # Add the xsec line feature to the xsec_lines layer
@@ -86,44 +98,77 @@ except Exception as e:
     raise Exception('---WARNING---, layer "xsec_lines" is not found') from None
 
 # Initialize xid
-try:
-    xid = xlayer.maximumValue(1) + 1
-except:
-    # An exception will occur if the layer is empty. Assume that is the cause.
-    xid = 1
+# The last xid used is kept in a project variable, so that the xid column
+# need not be scanned for its maximum on every run.  The scan is only done
+# when the variable is not yet set in this project.
+last_xid = QgsExpressionContextUtils.projectScope(
+                QgsProject.instance()).variable('xsec_max_xid')
+if last_xid is not None:
+    xid = int(last_xid) + 1
+else:
+    try:
+        xid = xlayer.maximumValue(1) + 1
+    except:
+        # An exception will occur if the layer is empty. Assume that is the cause.
+        xid = 1
 
 caps = xlayer.dataProvider().capabilities()
+# fields() returns a copy, so get it once for all of the new features.
+xfields = xlayer.fields()
+# Look up the attribute indices once, rather than by name on every feature.
+# lookupField matches names without regard to case, as setAttribute(name) does.
+i_xid = xfields.lookupField('xid')
+i_xpart = xfields.lookupField('xpart')
+i_xcommand = xfields.lookupField('xcommand')
+
+def polyline_geometry(coords):
+    """ Return a 2D polyline QgsGeometry through the (x,y) pairs in coords. """
+    return QgsGeometry.fromPolylineXY([QgsPointXY(u, v) for u, v in coords])
+
+def xsec_feature(coords, xpart, xcommand=None):
+    """ Return a new xsec_lines feature for this xid, with polyline coords. """
+    feat = QgsFeature(xfields)
+    feat.setGeometry(polyline_geometry(coords))
+    feat.setAttribute(i_xid, xid)
+    feat.setAttribute(i_xpart, xpart)
+    if xcommand is not None:
+        feat.setAttribute(i_xcommand, xcommand)
+    return feat
 
 if caps & QgsVectorDataProvider.AddFeatures:
-    x,y = xsec.sectionline.x, xsec.sectionline.y
-    pts = [QgsPoint(u,v) for u,v in zip(x,y)]
-    xline = QgsGeometry.fromPolyline(pts)
-
-    feat = QgsFeature(xlayer.fields())
-    feat.setGeometry(xline)
-    feat.setAttribute('xid', xid)
-    feat.setAttribute('xpart','L')
-    feat.setAttribute('xcommand',commandline)
-    xfeatures = [feat]
+    # The lines have no Z, so they are made from QgsPointXY.  The coordinates
+    # are converted to Python floats by numpy in one tolist() call, without 
+    # going through WKT text.
+    xfeatures = [xsec_feature(xsec.sectionline.xy.tolist(), 'L', commandline)]
     if xsec.normals:
-        for n in xsec.normals:
-            #print (n)
-            x,y = n.x, n.y
-            pts = [QgsPoint(u,v) for u,v in zip(x,y)]
-            feat = QgsFeature(xlayer.fields())
-            feat.setGeometry(QgsGeometry.fromPolyline(pts))
-            feat.setAttribute('xid', xid)
-            feat.setAttribute('xpart','N')
-            xfeatures.append(feat)
+        # The normals are a LineBatch; its end point arrays give each normal's
+        # two points without making a Line for each.  Their features are made
+        # in one list comprehension.
+        N = xsec.normals
+        ends = zip(zip(N.x0.tolist(), N.y0.tolist()), 
+                   zip(N.x1.tolist(), N.y1.tolist()))
+        xfeatures += [xsec_feature(p0p1, 'N') for p0p1 in ends]
         
-    (res, outFeats) = xlayer.dataProvider().addFeatures(xfeatures)
+    # The new feature ids are not read back, so FastInsert can skip updating
+    # them on the features.
+    (res, outFeats) = xlayer.dataProvider().addFeatures(xfeatures, 
+                                                        QgsFeatureSink.FastInsert)
+    if res:
+        QgsExpressionContextUtils.setProjectVariable(QgsProject.instance(), 
+                                                     'xsec_max_xid', xid)
 
     # Update the map view after adding features to the xsec_lines layer.
     xlayer.updateExtents()
-    if iface.mapCanvas().isCachingEnabled():
-        xlayer.triggerRepaint()
-    else:
-        iface.mapCanvas().refresh()
+
+    # Build the spatial index if the layer does not have one yet, so that the
+    # canvas does not scan every feature on each redraw as the layer grows.
+    if (caps & QgsVectorDataProvider.CreateSpatialIndex and 
+        xlayer.hasSpatialIndex() != QgsFeatureSource.SpatialIndexPresent):
+        xlayer.dataProvider().createSpatialIndex()
+
+    # The canvas redraws on the layer's repaint request whether or not caching
+    # is enabled; with caching only this layer's image is redrawn.
+    xlayer.triggerRepaint()
 
 #print ('xlayer.isValid() =',xlayer.isValid())
 #rint ('xlayer=',str(xlayer))
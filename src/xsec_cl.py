@@ -22,35 +22,42 @@ TODO:
 '''
 
 import argparse
+import functools
+import math
 import numpy as np
 from geometry_base import principle_rad_angle
 
 from version import __version__ as XSEC_VERSION
 
-components = """U:labels 
-                B:bdrk_depth 
-                C:casings  
-                F:hydrofrac 
-                G:grout 
-                H:hole 
-                M:pump
-                P:perforations 
-                S:screen 
-                T:stratigraphy
-                W:static_water_level)""".split()
-#                 L:lithology 
-components_dict = {c[0] : c[2:] for c in components}
-components_choices = sorted(list(components_dict.keys()))
-components_metavar = ' '.join(components_choices)
-components_text = 'Components include: ' + \
-                  ', '.join((f'{k}({v})' for k,v in components_dict.items()))
+# Well components that can be included or excluded, by their one-letter code.
+# These are literals, so nothing is computed at import time.
+components_dict = {'U': 'labels',
+                   'B': 'bdrk_depth',
+                   'C': 'casings',
+                   'F': 'hydrofrac',
+                   'G': 'grout',
+                   'H': 'hole',
+                   'M': 'pump',
+                   'P': 'perforations',
+                   'S': 'screen',
+                   'T': 'stratigraphy',
+                   'W': 'static_water_level'}
+#                  'L': 'lithology'
+components_choices = ['B', 'C', 'F', 'G', 'H', 'M', 'P', 'S', 'T', 'U', 'W']
+components_metavar = 'B C F G H M P S T U W'
+components_text = ('Components include: U(labels), B(bdrk_depth), C(casings),'
+                   ' F(hydrofrac), G(grout), H(hole), M(pump), P(perforations),'
+                   ' S(screen), T(stratigraphy), W(static_water_level)')
 
-components2 = list(components) + ['E:elevation']
-components2_dict = {c[0] : c[2:] for c in components2}
-components2_choices = sorted(list(components2_dict.keys()))
-components2_metavar = ' '.join(components2_choices)
-components2_text = 'Components include: ' + \
-                  ', '.join((f'{k}({v})' for k,v in components2_dict.items()))
+# Required and not-required options also include E, elevation.
+components2_dict = {**components_dict, 'E': 'elevation'}
+components2_choices = ['B', 'C', 'E', 'F', 'G', 'H', 'M', 'P', 'S', 'T', 'U', 
+                       'W']
+components2_metavar = 'B C E F G H M P S T U W'
+components2_text = components_text + ', E(elevation)'
+
+# The parser is built on the first call of xsec_parse_args and then reused.
+_PARSER = None
 
 def xsec_parser():
     """
@@ -236,11 +243,11 @@ def process_cmds(cmds):
     
     # restructure userline into a list of coordinate pairs [(x,y),(x,y), ...]
     if cmds.userline is not None:
-        u = cmds.userline
-        U = []
-        for i in range(0,len(u),2):
-            U.append((u[i], u[i+1]))
-        cmds.userline = U
+        if len(cmds.userline) % 2:
+            raise ValueError('--linehint needs x y pairs; got an odd number of'
+                             f' values: {cmds.userline}')
+        U = np.asarray(cmds.userline, dtype=float).reshape(-1, 2)
+        cmds.userline = [tuple(p) for p in U.tolist()]
     
     # The two options: exclude and includeonly are complementary in concept,
     # so only one is required by the program.  
@@ -250,30 +257,31 @@ def process_cmds(cmds):
     # while cmds.exclude is not updated to complement the includeonly options.
     # Therefore, The program should utilize only cmds.includeonly, and should 
     # not reference cmds.exclude; and is enforced by setting the latter to None. 
+    # A new includeonly list is made, because the default list is shared by
+    # every parse.
     if cmds.exclude:
         #exclude = ''.join(cmds.exclude)  # incase they are entered with spaces.
-        for a in cmds.exclude:
-            if a in cmds.includeonly:
-                cmds.includeonly.remove(a)
+        exclude = set(cmds.exclude)
+        cmds.includeonly = [a for a in cmds.includeonly if a not in exclude]
     cmds.exclude = None
     
     # If an element is both required and not_required, resolve the conflict by
     # making it not_required.
-    for a in cmds.not_required:
-        if a in cmds.required:
-            cmds.required.remove(a)
+    if cmds.not_required:
+        not_required = set(cmds.not_required)
+        cmds.required = [a for a in cmds.required if a not in not_required]
     
     # User angle hints are given in units of degrees east from north, and have 
     # to be copied to new variables in units of radians counterclockwise from 
     # east.
     cmds.userangle = cmds.userangledegrees
     if cmds.userangle is not None:
-        cmds.userangle = principle_rad_angle(np.radians(90-cmds.userangle))
+        cmds.userangle = principle_rad_angle(math.radians(90.0-cmds.userangle))
 
     cmds.userangle_constraint = cmds.userangle_constraintdegrees
     if cmds.userangle_constraintdegrees is not None:
-        d = min(np.abs(cmds.userangle_constraintdegrees), 90)
-        cmds.userangle_constraint = np.radians(d) 
+        d = min(abs(cmds.userangle_constraintdegrees), 90)
+        cmds.userangle_constraint = math.radians(d) 
         
     return cmds
 
@@ -311,19 +319,50 @@ def xsec_parse_args(args=None):
             cmds = xsec_parse_args(command_line_args.split())
             xsec = Xsec_main(cmds)
     """
-    
-    parser = xsec_parser()
     if args is None:
         # Handle a call from the command line
-        cmds = parser.parse_args()
+        return process_cmds(_get_parser().parse_args())
     elif isinstance(args, str):
         # Handle a call from another module with args = command line string.
-        cmds = parser.parse_args(args.split())
-    else:
-        # Handle a call from another module with args = list of command line args.
-        cmds = parser.parse_args(args)
-    cmds = process_cmds(cmds)
-    return cmds
+        args = args.split()
+    # Handle a call from another module with args = list of command line args.
+    # The cached cmds are frozen, so each caller gets a new Namespace.
+    return _thaw_cmds(_parse_tuple(tuple(args)))
+
+def _get_parser():
+    """ Return the parser, building it on the first call. """
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = xsec_parser()
+    return _PARSER
+
+@functools.lru_cache(maxsize=64)
+def _parse_tuple(args):
+    """
+    Return the processed cmds for a tuple of command line args, frozen.
+    
+    Returns
+    -------
+    tuple of (name, value, islist)
+        The cmds attributes.  List values are stored as tuples, and islist
+        is True for them.  The list items are str or tuples of float, so the
+        result is fully immutable and may be shared through the cache.
+    
+    Notes
+    -----
+    o   Repeated calls with the same args (e.g. re-running a QGIS selection)
+        skip argparse and process_cmds. 
+    o   Arguments that halt the parser (e.g. -h, or invalid args) raise
+        SystemExit, and are not cached.
+    """
+    cmds = process_cmds(_get_parser().parse_args(args))
+    return tuple((k, tuple(v), True) if isinstance(v, list) else (k, v, False)
+                 for k, v in vars(cmds).items())
+
+def _thaw_cmds(frozen):
+    """ Return a new Namespace with the frozen cmds, with lists restored. """
+    return argparse.Namespace(**{k: list(v) if islist else v 
+                                 for k, v, islist in frozen})
 
 
 
@@ -36,8 +36,11 @@ o   Outline of data reading process:
 """     
 #import abc
 # from collections import defaultdict
+import functools
 import os
-from collections import namedtuple
+import sqlite3
+import tempfile
+import unittest
 
 from cwi_db import c4db
 from xsec_data_abc import *
@@ -52,6 +55,7 @@ def flt(x):
     try: return float(x)
     except: return x
 
+@functools.lru_cache(maxsize=1024)
 def as_relateid(val):
     """
     Format string val as a RELATEID in table c4ix
@@ -69,11 +73,20 @@ def as_relateid(val):
             May have "**W" followed by 1-7 numbers, where ** is a county code
     
     Values that cannot be formatted as RELATEID are returned unmodified
+    
+    Notes
+    -----
+    o   The results are cached, as the same identifiers are often looked up
+        again in later cross sections.
+    o   Plain unique numbers are padded with str.zfill.  The isascii test keeps
+        other unicode digits on the int() path.
     """
     try:
         val = str(val).upper().replace('-','').replace(' ','').replace('#','')
         assert len(val) <= 10
-        if (val.startswith('H')):
+        if val.isascii() and val.isdigit():
+            return val.zfill(10)
+        elif (val.startswith('H')):
             return f"H{int(val[1:]):09d}"
         elif (val[2]=='W'):
             return f"{val[:2]}W{int(val[3:]):07d}"
@@ -191,10 +204,14 @@ class  xsec_data_OWI3(xsec_data_abc):
         """
         # Database connection
         assert os.path.exists(db_name), os.path.abspath(db_name)
-        c4 = c4db(open_db=True, commit=False, db_name=db_name) 
+        c4 = c4db(open_db=True, commit=False, db_name=db_name, read_only=True) 
         query = c4.cur.execute
         self.datasource = c4.db_name
         logger.info(f"read_database {self.datasource}")
+        # All of the selects below are made in one read transaction, so the
+        # database lock and WAL snapshot are taken once rather than per query.
+        # The connection is closed as soon as the tables have been read.
+        query("BEGIN;")
 
         ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### 
         """ 
@@ -206,57 +223,86 @@ class  xsec_data_OWI3(xsec_data_abc):
         dictionary self.d_label. self.d_iwid is the inverse of self.d_label; its
         only use is to enumerate identifiers that are not found at all.
         
-        ! Assumes that text searches in CWI are not case sensitive !
+        ! Text searches in SQLite are case sensitive. CWI identifiers are 
+          stored in upper case, so each identifier is also searched for in 
+          upper case. (COLLATE NOCASE is not used, because it would prevent
+          the use of the indexes on the identifier columns.)
         """
         identifiers = self.identifiers = tuple(identifiers)
-        qmarks = c4.qmarks(identifiers)
+        # The identifiers as given and in upper case, without repeats.
+        searchids = tuple(dict.fromkeys(
+                        identifiers + tuple(str(v).upper() for v in identifiers)))
           
-        s1 = """select wellid, %s from c4ix where %s in (%s);"""
+        # Capable of searching using the identifiers formatted as RELATEID's 
+        relateids = tuple((as_relateid(v) for v in identifiers))
 
+        # The search values are put in temp tables that the searches select 
+        # from, rather than bound as parameters, so that the number of SQL 
+        # variables does not grow with the number of identifiers.  The temp 
+        # tables are discarded when the connection is closed.
+        query("create temp table _searchids (id text primary key);")
+        query("create temp table _relateids (id text primary key);")
+        c4.cur.executemany("insert or ignore into _searchids values (?);", 
+                           [(str(v),) for v in searchids])
+        c4.cur.executemany("insert or ignore into _relateids values (?);", 
+                           [(str(v),) for v in relateids])
+
+        # The identifiers are searched for in several places, in order of 
+        # decreasing preference.  All of the searches are made in one query, and
+        # the matches are tagged by search so they can be used in that order.
+        #   1   c4ix.UNIQUE_NO 
+        #   2   c4ix.RELATEID
+        #   3   c4locs.relateid, using the identifiers formatted as RELATEIDs. 
+        #       c4locs is assumed to be a union of the locs and unlocs 
+        #       shapefiles provided with the c4 database.
+        #   4,5 c4id.identifier, the alternate identifiers table, using the 
+        #       identifiers as given and then formatted as RELATEIDs.
+        s1 = """select 1, wellid, UNIQUE_NO from c4ix 
+                  where UNIQUE_NO in (select id from _searchids)
+                union all
+                select 2, wellid, RELATEID from c4ix 
+                  where RELATEID in (select id from _searchids)
+                union all
+                select 3, wellid, cast(wellid as text) from c4locs 
+                  where relateid in (select id from _relateids)
+                union all
+                select 4, wellid, identifier from c4id 
+                  where identifier in (select id from _searchids)
+                    and ID_PROG in ('MNUNIQ','WMWSR','WSERIES')
+                union all
+                select 5, wellid, identifier from c4id 
+                  where identifier in (select id from _relateids)
+                    and ID_PROG in ('MNUNIQ','WMWSR','WSERIES');"""
+        found = {1:[], 2:[], 3:[], 4:[], 5:[]}
+        for n, wid, wname in query(s1):
+            found[n].append((wid, wname))
+
+        # An identifier that matches more than one well is documented by 
+        # adding the second and later wells found for it to duplicate_wids.
         wids = set()
-        for col in 'UNIQUE_NO RELATEID'.split():
-            data1 = query(s1%(col, col, qmarks), identifiers).fetchall()
-            for wid, wname in data1:
+        self.duplicate_wids = list()
+        def add_found(data):
+            for wid, wname in data:
                 if wid in wids: 
-                    # The columns are in order of decreasing preference, if an
-                    # identifier is already found, then discontinue this column
+                    # The searches are in order of decreasing preference, if an
+                    # identifier is already found, then skip it in this search.
                     continue
+                if wname in self.d_iwid:
+                    self.duplicate_wids.append(wid)
                 wids.add(wid) 
                 self.d_label[wid] = wname
                 self.d_iwid[wname] = wid
-            if len(wids) == len(self.identifiers):
-                break
-        
-        # Capable of searching using the identifiers formatted as RELATEID's 
-        relateids = tuple((as_relateid(v) for v in identifiers))
-        
-        # Capable of searching in the locs and unlocs shapefiles provided with 
-        # The c4 database. Assumed that these are combined into a single table
-        # named c4locs in the OWI database.
-        if len(wids) < len(self.identifiers):
-            s2 = f"""select wellid, cast(wellid as text) from c4locs 
-                     where relateid in ({qmarks});"""
-            data2 = query(s2, relateids).fetchall()
-            for wid, wname in data2:
-                if wid in wids: continue
-                wids.add(wid) 
-                self.d_label[wid] = wname
-                self.d_iwid[wname] = wid
-        
-        # Capable of searching the alternate identifiers table c4id
-        if len(wids) < len(self.identifiers):
-            s1 = f"""select wellid, identifier from c4id 
-                     where identifier in ({qmarks})
-                       and ID_PROG in ('MNUNIQ','WMWSR','WSERIES');"""
-            for vals in (identifiers, relateids):
-                data3 = query(s1, vals).fetchall()
-                for wid, wname in data3:
-                    if wid in wids: continue
-                    wids.add(wid) 
-                    self.d_label[wid] = wname
-                    self.d_iwid[wname] = wid
-                if len(wids) == len(self.identifiers):
-                    break
+
+        # Later searches are used only while some identifiers are not found.
+        add_found(found[1])
+        if len(wids) != len(identifiers):
+            add_found(found[2])
+        if len(wids) < len(identifiers):
+            add_found(found[3])
+        if len(wids) < len(identifiers):
+            add_found(found[4])
+            if len(wids) != len(identifiers):
+                add_found(found[5])
             
         wids = list(wids)   
         
@@ -266,20 +312,14 @@ class  xsec_data_OWI3(xsec_data_abc):
                 self.d_label[wid] = f"wellid {wid}"         
         
         # Document identifiers that have not been found.
+        # d_iwid has the identifiers as spelled in the database, which may 
+        # differ in case from those given, so they are compared in upper case.
         self.missing_identifiers = list()
         if len(wids) < len(self.identifiers):
-            for identifier in self.identifiers:
-                if not identifier in self.d_iwid:
-                    self.missing_identifiers.append(identifier)
-
-        # Document identifiers that have been found in duplicate.
-        self.duplicate_wids = list()
-        if len(wids) > len(self.identifiers):
-            w = set()
-            for wname, wid in self.d_label.items():
-                if wid in w:
-                    self.duplicate_wids.append(wid)
-                w.add(wid)
+            found_ids = {str(wname).upper() for wname in self.d_iwid}
+            self.missing_identifiers = [
+                identifier for identifier in self.identifiers
+                if not str(identifier).upper() in found_ids]
 
         logger.debug (f"identifiers = {identifiers}")
         logger.debug (f"wids = {wids}")
@@ -292,14 +332,34 @@ class  xsec_data_OWI3(xsec_data_abc):
         ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### 
         # Compose the common selection criteria on wids.
         # Compose the database queries as simple queries without joins that 
-        # store results as namedtuples.  Joining or sorting out information from 
-        # multiple tables into the value dictionaries and component dictionaries
-        # is done in Python code on the namedtuple's.  
-        # !!! The namedtuple field names are strictly lower case!!!  
+        # store results as plain row tuples.  Joining or sorting out information
+        # from multiple tables into the value dictionaries and component 
+        # dictionaries is done in Python code on the tuples, which are unpacked
+        # by position. So the field order listed for each table must match the 
+        # unpacking of its rows below.
  
         dat = {}
-        qmarks = c4.qmarks(wids)
-        where = f"where wellid in ({qmarks})"
+        # The wids are put in a temp table that each select joins to, rather 
+        # than passed to each select as a list of parameters.  The temp table
+        # is discarded when the connection is closed.
+        query("create temp table _wids (wellid integer primary key);")
+        c4.cur.executemany("insert into _wids values (?);", 
+                           [(wid,) for wid in wids])
+        # Rows that cannot pass any of the tests in the Python loops below are 
+        # dropped by SQLite, so they are not fetched.  The filters are looser 
+        # than those tests, which are still made on each row that is fetched.
+        filters = {
+            'c4ix'  :"""where elevation > 500 or case_diam > 0.001 
+                           or aquifer is not null or case_depth > 0 
+                           or depth_comp > 0 or depth_drll > 0 
+                           or depth2bdrk is not null""",
+            'c4c1'  :"""where ohbotfeet > 0 or dropp_len > 0 
+                           or (hydrofrac = 'Y' and hfto > 0)""",
+            'c4c2'  :"""where constype in ('C','G','H','S') 
+                          and to_depth > coalesce(from_depth, 0)""",
+            'c4st'  :"""where depth_top is not null and depth_bot > depth_top 
+                          and strat <> ''"""
+            }
         for tbl,flds in {
             'c4ix'  :"""wellid  unique_no  elevation  case_diam  aquifer  
                         case_depth  depth_comp  depth_drll  depth2bdrk""",  
@@ -315,9 +375,10 @@ class  xsec_data_OWI3(xsec_data_abc):
                         lith_prim  lith_sec  lith_minor"""            
             }.items():
             flds = flds.split()
-            sql = f"select {', '.join(flds)} from {tbl} {where};"   
-            ntup = namedtuple(tbl, flds) 
-            dat[tbl] = [ntup(*row) for row in query(sql, wids).fetchall()]   
+            sql = (f"select {', '.join(flds)} from {tbl} "
+                   f"join _wids using (wellid) {filters.get(tbl, '')};")
+            dat[tbl] = query(sql).fetchall()   
+        c4.close_db()
 
         #debugging
         logger.debug (', '.join((f"{tbl}:{len(dat[tbl])}" for tbl in dat.keys()))) 
@@ -339,10 +400,11 @@ class  xsec_data_OWI3(xsec_data_abc):
         # that data is present in both tables and is unequal, we currently 
         # assume that c4locs is more reliable.
         # Having an xy coordinate could be required at this point, but is not.
-        for row in dat['c4ix']:
-            i,z,d,a = row.wellid, flt(row.elevation), flt(row.case_diam), row.aquifer
-            if not i in wids: 
-                continue
+        # Each table is read in one pass that fills all of its dictionaries.
+        # c4locs is read second, so that its values replace those of c4ix.
+        for (i, _, z, d, a, c, p, dd, b) in dat['c4ix']:
+            z, d = flt(z), flt(d)
+            c, p, dd, b = flt(c), flt(p), flt(dd), flt(b)
             
             if i and z and z>500:
                 self.dz_grade[i] = z
@@ -352,13 +414,25 @@ class  xsec_data_OWI3(xsec_data_abc):
 
             if i and a:
                 self.d_aquifer[i] = a
+
+            if isnum(c) and c>0:   #CASE_DEPTH
+                self.dz_casing[i] =  c
+            
+            if isnum(p) and p>0:   #DEPTH_COMP
+                self.dz_bot[i] = p
+            
+            elif isnum(dd) and dd>0: # DEPTH_DRLL
+                self.dz_bot[i] = dd 
+
+            if isnum(b):   # DEPTH2BDRK
+                self.dz_bdrk[i] = b                        
         
-        logger.debug (f"A {len(self.dz_grade)}, {len(self.d_diameter)}, {len(self.d_aquifer)}" )     
-        for row in dat['c4locs']:
-            i,z,d,a = row.wellid, flt(row.elevation), flt(row.case_diam), row.aquifer
-            x,y = row.utme, row.utmn
-            if not i in wids: 
-                continue
+        logger.debug ("A %s, %s, %s, %s, %s, %s", len(self.dz_grade), 
+                      len(self.d_diameter), len(self.d_aquifer),
+                      len(self.dz_casing), len(self.dz_bot), len(self.dz_bdrk))
+        for (i, z, d, a, c, p, dd, b, n, s, x, y) in dat['c4locs']:
+            z, d = flt(z), flt(d)
+            c, p, dd, b, s = flt(c), flt(p), flt(dd), flt(b), flt(s)
 
             if i and x and y:
                 self.d_xy[i] = Coord(x,y)
@@ -373,50 +447,13 @@ class  xsec_data_OWI3(xsec_data_abc):
             if i and a:
                 self.d_aquifer[i] = a
 
-        logger.debug (f"B {len(self.dz_grade)}, {len(self.d_diameter)}, {len(self.d_aquifer)}")      
-        
-        # local shorthand dicts, D and Z
-        D = dict(self.d_diameter)        
-#         Z = dict(self.dz_grade)
-        
-        #logger.debug (f"C {self.dmin}, {self.dmax}")     
-        
-        for row in dat['c4ix']:
-            i,c,b = row.wellid, flt(row.case_depth), flt(row.depth2bdrk) 
-            p,d   = flt(row.depth_comp), flt(row.depth_drll) 
-            logger.debug (f"D {row}")
-            if not i in wids: 
-                continue
-
-            if isnum(c) and c>0:   #CASE_DEPTH
-                self.dz_casing[i] =  c
-            
-            if isnum(p) and p>0:   #DEPTH_COMP
-                self.dz_bot[i] = p
-            
-            elif isnum(d) and d>0: # DEPTH_DRLL
-                self.dz_bot[i] = d 
-
-            if isnum(b):   # DEPTH2BDRK
-                self.dz_bdrk[i] = b                        
-        
-        logger.debug (f"E {len(self.dz_casing)}, {len(self.dz_bot)}, {len(self.dz_bdrk)}")     
-
-        for row in dat['c4locs']:
-            i,c,b = row.wellid, flt(row.case_depth), flt(row.depth2bdrk) 
-            p,d   = flt(row.depth_comp), flt(row.depth_drll) 
-            n,s   = row.swlcount, flt(row.swlavgmeas)
-            
-            if not i in wids: 
-                continue
-
             if c and c> 0:    # CASE_DEPTH              
                 self.dz_casing[i] = c  
 
             if p and p> 0:    # DEPTH_COMP           
                 self.dz_bot[i] = p     
-            elif d and d>0:   # DEPTH_DRLL 
-                self.dz_bot[i] = d
+            elif dd and dd>0: # DEPTH_DRLL 
+                self.dz_bot[i] = dd
             
             if b and b>0:     # DEPTH2BDRK
                 self.dz_bdrk[i] = b
@@ -424,29 +461,37 @@ class  xsec_data_OWI3(xsec_data_abc):
             if isnum(n) and n>0 and isnum(s):      # SWLAVGELEV
                 self.dz_swl[i] = s  
             
-        logger.debug (f"F {len(self.dz_casing)}, {len(self.dz_bot)}, {len(self.dz_bdrk)}, {len(self.dz_swl)}")      
+        logger.debug ("B %s, %s, %s, %s, %s, %s, %s", len(self.dz_grade), 
+                      len(self.d_diameter), len(self.d_aquifer),
+                      len(self.dz_casing), len(self.dz_bot), len(self.dz_bdrk),
+                      len(self.dz_swl))      
+        
+        # local shorthand dicts, D and Z, and lookups used in the loops below.
+        D = dict(self.d_diameter)        
+#         Z = dict(self.dz_grade)
+        labels = self.d_label
+        get_d = D.get
 
         ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ###
         # Table c4c1:
         # wellid, ohtopfeet, ohbotfeet, dropp_len, hydrofrac,  hffrom,  hfto  
-        for row in dat['c4c1']:
-            i, t,b  = row.wellid, flt(row.ohtopfeet), flt(row.ohbotfeet)   
-            p, h,ht,hb = flt(row.dropp_len), row.hydrofrac, flt(row.hffrom), flt(row.hfto)
+        for (i, t, b, p, h, ht, hb) in dat['c4c1']:
+            t, b, p, ht, hb = flt(t), flt(b), flt(p), flt(ht), flt(hb)
             
 #             if not i in Z: continue
-            d = D.get(i,None)
+            d = get_d(i)
             #d2 = self.d_maxdia[i]
-            label = self.d_label[wid]
+            label = labels[i]
             
             if t and b and t>=0 and b>0:
-                self.dz_openhole[i] = Openhole(wid, label, d, t, b, 
+                self.dz_openhole[i] = Openhole(i, label, d, t, b, 
                                                None, None, b-t)
 
             if p and p>0:
-                self.dz_droppipe[i] = Droppipe(wid, label, None, 0, p, None, None, p)
+                self.dz_droppipe[i] = Droppipe(i, label, None, 0, p, None, None, p)
 
             if h and ht and hb and h=='Y' and ht>=0 and hb>0:
-                self.dz_hydrofrac[i] = Hydrofrac(wid, label, ht, hb, 
+                self.dz_hydrofrac[i] = Hydrofrac(i, label, ht, hb, 
                                                 None, None, hb-ht)
 
         # logger.debug (f"G {len(self.dz_openhole)}, {len(self.dz_droppipe)}, {len(self.dz_hydrofrac)}")      
@@ -461,59 +506,63 @@ class  xsec_data_OWI3(xsec_data_abc):
         #    grout:  (diameter, top, bottom, material, amount, units) **
         #    screen: (diamter, top, bottom, slot, length)
         #
+        # The rows are first sorted out by CONSTYPE, keeping their order, so 
+        # that each CONSTYPE is read in its own loop.
+        c4c2 = {'C':[], 'S':[], 'G':[], 'H':[]}
         for row in dat['c4c2']:
-            i,constype, d = row.wellid, row.constype, flt(row.diameter)
-            t,b, s,l  = flt(row.from_depth), flt(row.to_depth), flt(row.slot), flt(row.length)
-            m,a,u     = row.material, flt(row.amount), row.units
-#             if not i in Z: continue
-            label = self.d_label[i]
+            if row[1] in c4c2:
+                c4c2[row[1]].append(row)
 
-            # Casing: If From_depth missing, assume it is at grade
-            if constype=='C' and isnum(b): 
+        # Casing: If From_depth missing, assume it is at grade
+        for (i, _, d, t, b, _, _, _, _, _) in c4c2['C']:
+            d, t, b = flt(d), flt(t), flt(b)
+            if isnum(b): 
                 if t is None: t = 0
                 if b>t:
-                    self.dlz_casing2[i].append(Casing(i,label, d, t, b, 
-                                                      None, None, b-t))
-
-            # Screen: If From_ depth missing, do not read 
-            elif constype=='S' and isnum(t) and b and b>t:
-                self.dlz_screen[i].append(Screen(i,label, d, t, b, 
-                                                 None, None, l, m, s))
+                    self.dlz_casing2.setdefault(i, []).append(
+                        Casing(i, labels[i], d, t, b, None, None, b-t))
+
+        # Screen: If From_ depth missing, do not read 
+        for (i, _, d, t, b, s, l, m, _, _) in c4c2['S']:
+            d, t, b, s, l = flt(d), flt(t), flt(b), flt(s), flt(l)
+            if isnum(t) and b and b>t:
+                self.dlz_screen.setdefault(i, []).append(
+                    Screen(i, labels[i], d, t, b, None, None, l, m, s))
             
-            # Grout: If From_depth missing, assume it is at grade
-            elif constype=='G' and isnum(b):
+        # Grout: If From_depth missing, assume it is at grade
+        for (i, _, d, t, b, _, _, m, a, u) in c4c2['G']:
+            d, t, b, a = flt(d), flt(t), flt(b), flt(a)
+            if isnum(b):
                 if t is None: t = 0
                 if b>t:
-                    self.dlz_grout[i].append(Grout(i,label, d,d, t, b, 
-                                                   None, None, b-t, m, a, u ))
+                    self.dlz_grout.setdefault(i, []).append(
+                        Grout(i, labels[i], d,d, t, b, None, None, b-t, m, a, u))
             
-            # Hole: If From_depth is missing, assume it is at grade
-            elif constype=='H' and isnum(b):
+        # Hole: If From_depth is missing, assume it is at grade
+        for (i, _, d, t, b, _, _, _, _, _) in c4c2['H']:
+            d, t, b = flt(d), flt(t), flt(b)
+            if isnum(b):
                 if t is None: t = 0
                 if b>t:
-                    self.dlz_hole[i].append( Hole(i,label, d, t, b, 
-                                                  None, None, b-t))
+                    self.dlz_hole.setdefault(i, []).append(
+                        Hole(i, labels[i], d, t, b, None, None, b-t))
 
         logger.debug (f"H {len(self.dlz_casing2)}, {len(self.dlz_screen)}, {len(self.dlz_grout)}, {len(self.dlz_hole)}")      
 
         ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ### ###
         # Table c5st
         # One well can have multiple strat layers.
-        for row in dat['c4st']:
-            i, t,b  = row.wellid, flt(row.depth_top), flt(row.depth_bot) 
-            r,c,h,s = row.drllr_desc, row.color, row.hardness, row.strat  
-            l1,l2,lm = row.lith_prim, row.lith_sec, row.lith_minor
+        for (i, t, b, r, c, h, s, l1, l2, lm) in dat['c4st']:
+            t, b = flt(t), flt(b)
             
             if isnum(t) and isnum(b) and (b>t) and s:
-                label = self.d_label[i]
-                self.dlz_strat[i].append(
-                    Strat(i, label, t, b, None, None, b-t,
+                self.dlz_strat.setdefault(i, []).append(
+                    Strat(i, labels[i], t, b, None, None, b-t,
                           r, c, h, s, l1, l2, lm))
-                logger.debug (f"I {row}, z={z}")
+                logger.debug ("I %s, z=%s", (i, t, b, s), z)
 
         logger.debug (f"J {len(self.dlz_strat)}")      
                    
-        c4.close_db()    
         self.wids = tuple(wids)
         return (len(self.d_xy) > 0)
 
@@ -720,6 +769,30 @@ class  xsec_data_OWI3(xsec_data_abc):
                     print (f"  h H.bot={dh.zbot:5.1f}, H.d={dh.d:4.1f}, ({dg.din:4.1f},{dg.dout:4.1f})", found)
                     if found: break
         
+
+
+class Test(unittest.TestCase):
+    
+    def test_read_database_identifier_case(self):
+        """ A lower case identifier that is found is not reported missing. """
+        schema = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                              '..', 'demo_data', 'cwischema_c4.3.0.sql')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_name = os.path.join(tmpdir, 'c4test.sqlite')
+            con = sqlite3.connect(db_name)
+            with open(schema) as f:
+                con.executescript(f.read())
+            con.execute("""insert into c4ix (wellid, RELATEID, UNIQUE_NO, 
+                                             ELEVATION)
+                           values (1, 'H000012345', 'H12345', 900);""")
+            con.commit()
+            con.close()
+            
+            D = xsec_data_OWI3()
+            D.read_database(['h12345', '99999'], db_name)
+            self.assertEqual(D.wids, (1,))
+            self.assertEqual(D.missing_identifiers, ['99999'])
+
     
 if __name__=='__main__':
     from xsec_cl import xsec_parse_args
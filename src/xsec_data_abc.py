@@ -107,12 +107,21 @@ Notes Oct 30, 2021
 '''
 
 import abc
-from collections import defaultdict , namedtuple
+from collections import namedtuple
 from dataclasses import dataclass
 import unittest
 
 def isnum(n):
-    """ Return True if n is a number, else False """
+    """ 
+    Return True if n is a number, else False 
+    
+    The common database values float, int, None, and str are decided by type,
+    without raising and catching an exception.
+    """
+    if type(n) in (float, int):
+        return True
+    if n is None or isinstance(n, str):
+        return False
     try:
         y = n+1 # Triggers an exception when y is not a numeric type.
         return True
@@ -127,6 +136,11 @@ When filling the Dataclasses with data, use None for missing data.
 
 Coord is defined as a namedtuple rather than a Dataclass, because it is simpler
 and is often accessed as a tuple.
+
+The Dataclasses declare __slots__, so that each instance does not carry a 
+__dict__.  Python 3.7 dataclasses have no slots option, so the field names are
+repeated in __slots__; keep the two in step.  None of the fields has a default,
+which __slots__ would not allow.
 '''
 
 Coord = namedtuple('Coord',   ['x','y'])
@@ -135,6 +149,8 @@ class z_updater:
     """ 
     A mixin class for updating z values from depths and a given datum
     """
+    __slots__ = ()
+
     def updatez(self, datum):
         try:
             self.ztop = datum - self.depth_top
@@ -144,6 +160,8 @@ class z_updater:
             
 @dataclass
 class Casing(z_updater):
+    __slots__ = ('wid', 'label', 'd', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length')
     wid : int
     label : str
     d : float
@@ -155,6 +173,8 @@ class Casing(z_updater):
  
 @dataclass
 class Droppipe(z_updater):
+    __slots__ = ('wid', 'label', 'd', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length')
     wid : int
     label : str
     d : float
@@ -166,6 +186,8 @@ class Droppipe(z_updater):
  
 @dataclass
 class Grout(z_updater):
+    __slots__ = ('wid', 'label', 'din', 'dout', 'depth_top', 'depth_bot',
+                 'ztop', 'zbot', 'length', 'material', 'amount', 'units')
     wid : int
     label : str
     din : float
@@ -181,6 +203,8 @@ class Grout(z_updater):
 
 @dataclass
 class Hole(z_updater):
+    __slots__ = ('wid', 'label', 'd', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length')
     wid : int
     label : str
     d : float
@@ -192,6 +216,8 @@ class Hole(z_updater):
  
 @dataclass
 class Hydrofrac(z_updater):
+    __slots__ = ('wid', 'label', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length')
     wid : int
     label : str
     depth_top : float
@@ -202,6 +228,8 @@ class Hydrofrac(z_updater):
  
 @dataclass
 class Openhole(z_updater):
+    __slots__ = ('wid', 'label', 'd', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length')
     wid : int
     label : str
     d : float
@@ -213,6 +241,8 @@ class Openhole(z_updater):
  
 @dataclass
 class Perf(z_updater):
+    __slots__ = ('wid', 'label', 'd', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length', 'method')
     wid : int
     label : str
     d : float
@@ -225,6 +255,8 @@ class Perf(z_updater):
  
 @dataclass
 class Screen(z_updater):
+    __slots__ = ('wid', 'label', 'd', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length', 'material', 'slot')
     wid : int
     label : str
     d : float
@@ -238,6 +270,9 @@ class Screen(z_updater):
  
 @dataclass
 class Strat(z_updater):
+    __slots__ = ('wid', 'label', 'depth_top', 'depth_bot', 'ztop', 'zbot',
+                 'length', 'drllr_desc', 'color', 'hardness', 'strat',
+                 'lith_prim', 'lith_sec', 'lith_minor')
     wid : int
     label : str
     depth_top : float
@@ -330,13 +365,15 @@ class xsec_data_abc(abc.ABC):
         self.dz_droppipe  = dict() #{wid : Droppipe(),... }
         self.dz_hydrofrac = dict() #{wid : Hydrofrac(),... }
             
-        # These dictionaries have a list of namedtuples for each wid
-        self.dlz_casing2  = defaultdict(list) #{wid : [Casing(),..], ...}  
-        self.dlz_perf     = defaultdict(list) #{wid : [Perf(),..], ...} 
-        self.dlz_hole     = defaultdict(list) #{wid : [Hole(),..], ...} 
-        self.dlz_grout    = defaultdict(list) #{wid : [Grout(), ...}
-        self.dlz_screen   = defaultdict(list) #{wid : [Screen, ...], ...}
-        self.dlz_strat    = defaultdict(list) #{wid : [Strat, ...], ...}
+        # These dictionaries have a list of namedtuples for each wid.
+        # They are plain dicts, so that looking up a wid without entries does 
+        # not add an empty list; add entries with .setdefault(wid, []).append()
+        self.dlz_casing2  = dict() #{wid : [Casing(),..], ...}  
+        self.dlz_perf     = dict() #{wid : [Perf(),..], ...} 
+        self.dlz_hole     = dict() #{wid : [Hole(),..], ...} 
+        self.dlz_grout    = dict() #{wid : [Grout(), ...}
+        self.dlz_screen   = dict() #{wid : [Screen, ...], ...}
+        self.dlz_strat    = dict() #{wid : [Strat, ...], ...}
                
     def __str__(self):  
         rv = [f"{25*'='}  xsec xsec_data_OWI  {25*'='}", 
@@ -823,6 +860,22 @@ class Test(unittest.TestCase):
         self.assertAlmostEqual(d[1].y, d[2].y, 6)
         self.assertAlmostEqual(d[2].y, d[3].y, 6)
  
+    def test_isnum(self):
+        for n in (0, 1, -2.5, True, float('nan')):
+            self.assertTrue(isnum(n))
+        for n in (None, '', '3', b'3', [1], {}):
+            self.assertFalse(isnum(n))
+
+    def test_component_slots(self):
+        from dataclasses import fields
+        for cls in (Casing, Droppipe, Grout, Hole, Hydrofrac, Openhole, Perf, 
+                    Screen, Strat):
+            self.assertEqual(cls.__slots__, tuple(f.name for f in fields(cls)))
+        c = Casing(1, 'a', 4.0, 0.0, 10.0, None, None, 10.0)
+        self.assertFalse(hasattr(c, '__dict__'))
+        c.updatez(900.)
+        self.assertEqual((c.ztop, c.zbot), (900., 890.))
+
 
 if __name__ == "__main__":  
     unittest.main()   
@@ -100,8 +100,11 @@ class xsec_draw():
             for n in normals:
                 axs.plot(n.xy[:,0], n.xy[:,1], 'b')  
         
+        # Draw all of the wells with one Line2D rather than one per well. 
+        x = [xy.x for xy in d_xy.values()]
+        y = [xy.y for xy in d_xy.values()]
+        axs.plot(x, y, 'or', linestyle='')
         for wid, xy in d_xy.items():      
-            axs.plot(xy.x, xy.y, 'or')
             axs.text(xy.x, xy.y, d_label[wid])
         axs.set_aspect('equal')
  
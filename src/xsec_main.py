@@ -397,7 +397,9 @@ class Xsec_main():
             sl = projected_section_line(self.data.d_xy, cmds) 
         
         self.ordered_wids, self.sectionline, self.normals = sl
-        self.snodes = self.sectionline.snodes
+        # Keep a copy: update_normals() later moves the section line nodes and
+        # recomputes its snodes in place, but these are the projected wells.
+        self.snodes = self.sectionline.snodes.copy()
         if len(self.data.d_xy) <= 1:
             self.slims = None
         else:
@@ -701,11 +703,11 @@ class Xsec_main():
             return
         
         
-        # self.sectionline.snodes are cumulative linear coords of wells along a
+        # self.snodes are cumulative linear coords of wells along a
         # fence-line or a projection-line.
         # self.Unodes are mapping of snodes onto unitless U coordinates,
         # allowing for left and right margins.
-        s = self.sectionline.snodes
+        s = self.snodes
         s0, s1 = min(s), max(s)
         s2U = (U1m - U0m)/(s1-s0)
         Unodes = U0m + (s-s0) * s2U 
@@ -744,10 +746,9 @@ class Xsec_main():
         
         # The normals for points that are adjusted will be not be exactly normal.
         legend = map_legends()['normals']
-        self.normals = []
-        for i, wid in enumerate(self.ordered_wids):
-            p0, p1 = self.data.d_xy[wid], self.sectionline.xy[i,:] 
-            self.normals.append( geometry_base.Line((p0,p1), **legend) )
+        self.normals = geometry_base.LineBatch(
+            [self.data.d_xy[wid] for wid in self.ordered_wids], 
+            self.sectionline.xy, **legend)
 
         
     ################# Scaling for drawing: factors and functions ###############
@@ -842,21 +843,22 @@ class Xsec_main():
         -----
         o   The major and minor gridline elevations are determined elsewhere.
         o   Uses ulims as the grid line left and right limits.
+        o   The gridlines of each kind are constructed together by 
+            Plyline.from_batch, as 2-node polylines.
         """
         u0,u1 = self.ulims
-        minorlegend = self.dlegend['gridminor']
-        majorlegend = self.dlegend['gridmajor']
-        v = self.vofz
-        for z in self.minor_gridz:
-            v = self.vofz(z)
-            uv = ((u0,v), (u1,v))
-            L = geometry_base.Line(uv, zorder=0, label=f'{z}',  **minorlegend)
-            D.line(L)
-        for z in self.major_gridz:
-            v = self.vofz(z)
-            uv = ((u0,v), (u1,v))
-            L = geometry_base.Line(uv, zorder=0, label=f'{z}',  **majorlegend)
-            D.line(L)
+        for gridz, legend in ((self.minor_gridz, self.dlegend['gridminor']),
+                              (self.major_gridz, self.dlegend['gridmajor'])):
+            n = len(gridz)
+            if n == 0:
+                continue
+            v = self.vofz(np.asarray(gridz, dtype=float))
+            lines = geometry_base.Plyline.from_batch(
+                        np.arange(0, 2*n+1, 2), np.tile((u0,u1), n), 
+                        np.repeat(v, 2), labels=[f'{z}' for z in gridz], 
+                        zorder=0, **legend)
+            for L in lines:
+                D.line(L)
 
     def draw_strat(self, D):
         """